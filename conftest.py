@@ -0,0 +1,13 @@
+"""
+Test configuration.
+
+Keeping this file in the project root puts the root directory on sys.path,
+so plain "pytest" finds the vaccination package without installing it.
+
+This file is part of the vaccination.py.
+
+(c) 2021 Temuri Takalandze <me@abgeo.dev>
+
+For the full copyright and license information, please view the LICENSE
+file that was distributed with this source code.
+"""
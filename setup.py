@@ -65,6 +65,10 @@ setup(
     packages=find_packages(),
     python_requires=">=3.6",
     install_requires=get_requirements("default.txt"),
+    extras_require={
+        "analytics": get_requirements("analytics.txt"),
+        "http2": get_requirements("http2.txt"),
+    },
     entry_points={
         "console_scripts": [
             "vaccination = vaccination.__main__:main",
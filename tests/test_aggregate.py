@@ -0,0 +1,224 @@
+"""
+This file is part of the vaccination.py.
+
+(c) 2021 Temuri Takalandze <me@abgeo.dev>
+
+For the full copyright and license information, please view the LICENSE
+file that was distributed with this source code.
+"""
+
+import copy
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import pytest
+
+from vaccination.service.aggregate import AggregatedBookingService
+from vaccination.service.api.base import Deadline, DeadlineExceededError
+from vaccination.service.pipeline import iter_locations, iter_slots
+
+START, END = date(2021, 9, 20), date(2021, 9, 27)
+
+
+def _day(name: str, *slots: str) -> dict:
+    return {
+        "dateName": name,
+        "weekName": "ორშაბათი",
+        "slots": [{"value": slot} for slot in slots],
+    }
+
+
+class FakeBookingAPIService:
+    """
+    In-memory stand-in for BookingAPIService with per-app data.
+    """
+
+    def __init__(self, delay: float = 0.0, failing: dict = None):
+        self.delay = delay
+        self.failing = failing or {}
+        self.regions = {
+            "abc": [{"id": "r1", "geoName": "თბილისი"}],
+            "def": [
+                {"id": "r1", "geoName": "თბილისი"},
+                {"id": "r2", "geoName": "ბათუმი"},
+            ],
+        }
+        self.rooms = {
+            "abc": [
+                {
+                    "name": "room 1",
+                    "schedules": [
+                        {"dates": [_day("2021-09-21", "10:00"), _day("2021-09-20")]}
+                    ],
+                }
+            ],
+            "def": [
+                {
+                    "name": "room 1",
+                    "schedules": [
+                        {"dates": [_day("2021-09-20", "11:00", "09:00")]},
+                        {"dates": [_day("2021-09-21", "10:00", "10:30")]},
+                    ],
+                },
+                {
+                    "name": "room 2",
+                    "schedules": [{"dates": [_day("2021-09-22", "12:00")]}],
+                },
+            ],
+        }
+
+    def _call(self, app: str, data: dict) -> list:
+        time.sleep(self.delay)
+        if app in self.failing:
+            raise self.failing[app]()
+        return data[app]
+
+    def get_regions(self, service, only_free=True, app="def", deadline=None):
+        del service, only_free, deadline
+        return self._call(app, self.regions)
+
+    def get_municipalities(
+        self, region, service, only_free=True, app="def", deadline=None
+    ):
+        del service, only_free, deadline
+        return self._call(app, {app: [{"id": f"{region}m1", "geoName": "რაიონი"}]})
+
+    def get_municipality_branches(
+        self, service, municipality, only_free=True, app="def", deadline=None
+    ):
+        del service, only_free, deadline
+        return self._call(app, {app: [{"id": f"{municipality}b1", "name": "ფილიალი"}]})
+
+    def get_slots(
+        self, branch, region, service, start_date, end_date, app="def", deadline=None
+    ):
+        del branch, region, service, start_date, end_date, deadline
+        return self._call(app, self.rooms)
+
+
+@pytest.fixture(name="api_service")
+def fixture_api_service():
+    return FakeBookingAPIService()
+
+
+def _aggregator(api_service, **kwargs) -> AggregatedBookingService:
+    return AggregatedBookingService(api_service, **kwargs)
+
+
+def test_locations_are_merged_by_id(api_service):
+    regions = _aggregator(api_service).get_regions("s1")
+
+    assert regions == [
+        {"id": "r1", "geoName": "თბილისი", "apps": ["abc", "def"]},
+        {"id": "r2", "geoName": "ბათუმი", "apps": ["def"]},
+    ]
+
+
+def test_slots_are_merged_by_room_day_and_time(api_service):
+    original = copy.deepcopy(api_service.rooms)
+
+    rooms = _aggregator(api_service).get_slots("b1", "r1", "s1", START, END)
+
+    assert [room["name"] for room in rooms] == ["room 1", "room 2"]
+    days = rooms[0]["schedules"][0]["dates"]
+    assert [day["dateName"] for day in days] == ["2021-09-20", "2021-09-21"]
+    assert days[0]["slots"] == [
+        {"value": "09:00", "apps": ["def"]},
+        {"value": "11:00", "apps": ["def"]},
+    ]
+    assert days[1]["slots"] == [
+        {"value": "10:00", "apps": ["abc", "def"]},
+        {"value": "10:30", "apps": ["def"]},
+    ]
+    assert api_service.rooms == original
+
+
+def test_app_restricts_query(api_service):
+    regions = _aggregator(api_service).get_regions("s1", app="abc")
+
+    assert regions == [{"id": "r1", "geoName": "თბილისი", "apps": ["abc"]}]
+
+
+def test_failing_app_is_skipped(api_service):
+    api_service.failing = {"abc": ConnectionError}
+    aggregator = _aggregator(api_service)
+
+    regions = aggregator.get_regions("s1")
+
+    assert [region["apps"] for region in regions] == [["def"], ["def"]]
+    assert isinstance(aggregator.errors["abc"], ConnectionError)
+
+
+def test_all_apps_failing_raises(api_service):
+    api_service.failing = {"abc": ConnectionError, "def": TimeoutError}
+
+    with pytest.raises(ConnectionError):
+        _aggregator(api_service).get_regions("s1")
+
+
+def test_expired_deadline_fails_the_call(api_service):
+    api_service.failing = {"abc": DeadlineExceededError}
+    deadline = Deadline.at(time.time() - 1)
+
+    with pytest.raises(DeadlineExceededError):
+        _aggregator(api_service).get_slots(
+            "b1", "r1", "s1", START, END, deadline=deadline
+        )
+
+
+def test_own_deadline_of_an_app_is_skipped(api_service):
+    api_service.failing = {"abc": DeadlineExceededError}
+    aggregator = _aggregator(api_service)
+
+    rooms = aggregator.get_slots("b1", "r1", "s1", START, END, deadline=Deadline(60))
+
+    assert [room["name"] for room in rooms] == ["room 1", "room 2"]
+    assert isinstance(aggregator.errors["abc"], DeadlineExceededError)
+    assert aggregator.get_regions("s1")[0]["apps"] == ["def"]
+
+
+def test_concurrent_failures_raise_their_own_errors():
+    class Failing(FakeBookingAPIService):
+        def get_regions(self, service, only_free=True, app="def", deadline=None):
+            raise LookupError(service)
+
+    aggregator = _aggregator(Failing())
+
+    def call(index: int) -> str:
+        try:
+            aggregator.get_regions(f"s{index}")
+        except LookupError as error:
+            return str(error)
+        return ""
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        services = list(executor.map(call, range(200)))
+
+    assert services == [f"s{index}" for index in range(200)]
+
+
+def test_concurrent_callers_are_not_serialized():
+    aggregator = _aggregator(FakeBookingAPIService(delay=0.1), callers=8)
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: aggregator.get_regions("s1"), range(8)))
+
+    assert time.monotonic() - started < 0.35
+    aggregator.close()
+
+
+def test_pipeline_crawls_all_apps_in_one_pass(api_service):
+    aggregator = _aggregator(api_service)
+
+    locations = list(iter_locations(aggregator, "s1", app=None))
+    records = list(iter_slots(aggregator, locations[:1], START, END))
+
+    assert [location["branch"] for location in locations] == ["r1m1b1", "r2m1b1"]
+    assert {record["app"] for record in records} == {"abc,def", "def"}
+    assert {
+        (record["room"], record["date"], record["time"])
+        for record in records
+        if record["app"] == "abc,def"
+    } == {("room 1", "2021-09-21", "10:00")}
@@ -0,0 +1,153 @@
+"""
+This file is part of the vaccination.py.
+
+(c) 2021 Temuri Takalandze <me@abgeo.dev>
+
+For the full copyright and license information, please view the LICENSE
+file that was distributed with this source code.
+"""
+
+import datetime
+
+import pytest
+
+from vaccination.service.alerts import AlertDispatcher, Subscription, SubscriptionIndex
+
+# 2021-09-20 is a Monday.
+MONDAY = datetime.date(2021, 9, 20)
+NOW = datetime.datetime(2021, 9, 20, 8, 0)
+
+
+def _record(day: datetime.date, time: str, **kwargs) -> dict:
+    return dict(
+        {
+            "app": "def",
+            "service": "s1",
+            "region": "r1",
+            "municipality": "m1",
+            "branch": "b1",
+            "room": "room",
+            "date": day.isoformat(),
+            "time": time,
+        },
+        **kwargs,
+    )
+
+
+def _matches(index: SubscriptionIndex, record: dict) -> list:
+    return sorted(
+        subscription.subscription_id for subscription in index.match(record, MONDAY)
+    )
+
+
+def test_match_by_service_location_and_window():
+    index = SubscriptionIndex()
+    index.add(Subscription("any", "s1"))
+    index.add(Subscription("region", "s1", "r1", start_time="09:00", end_time="12:00"))
+    index.add(Subscription("branch", "s1", "b1", weekdays=[0]))
+    index.add(Subscription("other-branch", "s1", "b2"))
+    index.add(Subscription("other-service", "s2"))
+
+    assert _matches(index, _record(MONDAY, "10:30")) == ["any", "branch", "region"]
+    assert _matches(index, _record(MONDAY, "12:00")) == ["any", "branch"]
+    assert _matches(index, _record(MONDAY + datetime.timedelta(days=1), "10:30")) == [
+        "any",
+        "region",
+    ]
+
+
+def test_remove_and_replace():
+    index = SubscriptionIndex()
+    index.add(Subscription("s", "s1", start_time="09:00", end_time="10:00"))
+    index.add(Subscription("s", "s1", start_time="14:00", end_time="15:00"))
+
+    assert len(index) == 1
+    assert _matches(index, _record(MONDAY, "09:30")) == []
+    assert _matches(index, _record(MONDAY, "14:30")) == ["s"]
+
+    index.remove("s")
+
+    assert len(index) == 0
+    assert _matches(index, _record(MONDAY, "14:30")) == []
+
+
+def test_overnight_window():
+    index = SubscriptionIndex()
+    index.add(
+        Subscription("night", "s1", weekdays=[0], start_time="22:00", end_time="02:00")
+    )
+    tuesday = MONDAY + datetime.timedelta(days=1)
+
+    assert _matches(index, _record(MONDAY, "23:30")) == ["night"]
+    assert _matches(index, _record(tuesday, "01:30")) == ["night"]
+    assert _matches(index, _record(tuesday, "02:00")) == []
+    assert _matches(index, _record(MONDAY, "01:30")) == []
+    assert _matches(index, _record(tuesday, "23:30")) == []
+
+
+def test_empty_window_is_rejected():
+    with pytest.raises(ValueError):
+        Subscription("empty", "s1", start_time="10:00", end_time="10:00")
+
+
+def test_date_range_follows_observation_day():
+    subscription = Subscription("s", "s1", days=14)
+    slot = datetime.datetime.combine(
+        MONDAY + datetime.timedelta(days=20), datetime.time(10)
+    )
+
+    assert not subscription.accepts(slot, MONDAY)
+    assert subscription.accepts(slot, MONDAY + datetime.timedelta(days=10))
+    assert not subscription.accepts(slot, slot.date() + datetime.timedelta(days=1))
+
+
+def test_fixed_start_date():
+    subscription = Subscription("s", "s1", days=1, start_date=MONDAY)
+    slot = datetime.datetime.combine(MONDAY, datetime.time(10))
+
+    assert subscription.accepts(slot, MONDAY + datetime.timedelta(days=10))
+    assert not subscription.accepts(slot + datetime.timedelta(days=1), MONDAY)
+
+
+def test_dispatcher_alerts_new_slots_once():
+    index = SubscriptionIndex()
+    index.add(Subscription("s", "s1"))
+    alerts = []
+    dispatcher = AlertDispatcher(index, [alerts.append], forget_after=60)
+    records = [_record(MONDAY, "10:00"), _record(MONDAY, "10:30")]
+
+    assert dispatcher.observe(records, NOW) == 2
+    assert dispatcher.observe(records, NOW + datetime.timedelta(seconds=30)) == 0
+    assert [alert["subscription"] for alert in alerts] == ["s", "s"]
+    assert alerts[0]["time"] == "10:00"
+
+
+def test_dispatcher_forgets_slots_that_disappear():
+    index = SubscriptionIndex()
+    index.add(Subscription("s", "s1"))
+    dispatcher = AlertDispatcher(index, [lambda alert: None], forget_after=60)
+    booked = _record(MONDAY, "10:00")
+    still_free = _record(MONDAY, "10:30")
+
+    assert dispatcher.observe([booked, still_free], NOW) == 2
+    later = NOW + datetime.timedelta(seconds=50)
+    assert dispatcher.observe([still_free], later) == 0
+    later += datetime.timedelta(seconds=50)
+    assert dispatcher.observe([booked, still_free], later) == 1
+    assert len(dispatcher._seen) == 2  # pylint: disable=protected-access
+
+
+def test_failing_sink_does_not_stop_dispatch():
+    def failing(alert):
+        raise ConnectionError(alert["time"])
+
+    index = SubscriptionIndex()
+    index.add(Subscription("s", "s1"))
+    alerts = []
+    dispatcher = AlertDispatcher(index, [failing, alerts.append])
+
+    records = [_record(MONDAY, "10:00"), _record(MONDAY, "10:30")]
+
+    assert dispatcher.observe(records, NOW) == 2
+    assert [alert["time"] for alert in alerts] == ["10:00", "10:30"]
+    assert [str(error) for _, error in dispatcher.errors] == ["10:00", "10:30"]
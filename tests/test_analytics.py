@@ -0,0 +1,113 @@
+"""
+This file is part of the vaccination.py.
+
+(c) 2021 Temuri Takalandze <me@abgeo.dev>
+
+For the full copyright and license information, please view the LICENSE
+file that was distributed with this source code.
+"""
+
+from datetime import datetime
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+# pylint: disable=wrong-import-position
+from vaccination.service.analytics import SlotArrays
+
+# 2021-09-20 is a Monday.
+NOW = datetime(2021, 9, 20, 8, 0)
+
+
+def _record(branch: str, region: str, day: str, time: str) -> dict:
+    return {
+        "service": "s1",
+        "region": region,
+        "branch": branch,
+        "branch_name": f"Branch {branch[1:]}",
+        "date": day,
+        "time": time,
+    }
+
+
+RECORDS = [
+    _record("b2", "r2", "2021-09-26", "23:45"),
+    _record("b1", "r1", "2021-09-21", "14:00"),
+    _record("b3", "r1", "2021-09-22", "08:00"),
+    _record("b1", "r1", "2021-09-20", "09:30"),
+    _record("b2", "r2", "2021-09-20", "10:15"),
+    _record("b1", "r1", "2021-09-20", "09:00"),
+]
+
+
+@pytest.fixture(name="arrays")
+def fixture_arrays():
+    return SlotArrays.from_records(RECORDS)
+
+
+def test_codes_index_names(arrays):
+    assert len(arrays) == 6
+    assert list(arrays.names["branch"]) == ["b1", "b2", "b3"]
+    assert list(arrays.names["region"]) == ["r1", "r2"]
+    assert list(arrays.names["branch"][arrays.branches]) == [
+        record["branch"] for record in RECORDS
+    ]
+
+
+def test_free_slots_per_day(arrays):
+    days, counts = arrays.free_slots_per_day()
+
+    assert [str(day) for day in days] == [
+        "2021-09-20",
+        "2021-09-21",
+        "2021-09-22",
+        "2021-09-26",
+    ]
+    assert counts.tolist() == [[2, 1, 1, 0], [1, 0, 0, 1]]
+
+
+def test_hour_heatmap(arrays):
+    heatmap = arrays.hour_heatmap()
+
+    expected = np.zeros((7, 24), dtype=np.int64)
+    expected[0, 9] = 2  # Monday 09:00 and 09:30
+    expected[0, 10] = 1  # Monday 10:15
+    expected[1, 14] = 1  # Tuesday 14:00
+    expected[2, 8] = 1  # Wednesday 08:00
+    expected[6, 23] = 1  # Sunday 23:45
+    assert heatmap.tolist() == expected.tolist()
+
+
+def test_first_available(arrays):
+    assert arrays.first_available(NOW).tolist() == [60, 135, 2 * 24 * 60]
+
+
+def test_first_available_histogram(arrays):
+    counts, edges = arrays.first_available_histogram(bins=2, now=NOW)
+
+    assert counts.tolist() == [2, 1]
+    assert edges[0] == 1
+    assert edges[-1] == 48
+
+
+def test_branch_ranking(arrays):
+    assert arrays.branch_ranking() == [
+        ("Branch 1", 3),
+        ("Branch 2", 2),
+        ("Branch 3", 1),
+    ]
+    assert arrays.branch_ranking(top=1) == [("Branch 1", 3)]
+
+
+def test_empty_input():
+    arrays = SlotArrays.from_records([])
+
+    days, counts = arrays.free_slots_per_day()
+
+    assert len(arrays) == 0
+    assert len(days) == 0
+    assert counts.shape == (0, 0)
+    assert arrays.hour_heatmap().sum() == 0
+    assert len(arrays.first_available(NOW)) == 0
+    assert arrays.branch_ranking() == []
@@ -0,0 +1,33 @@
+"""
+This file is part of the vaccination.py.
+
+(c) 2021 Temuri Takalandze <me@abgeo.dev>
+
+For the full copyright and license information, please view the LICENSE
+file that was distributed with this source code.
+"""
+
+import time
+
+import pytest
+
+from vaccination.service.api.base import Deadline, DeadlineExceededError
+
+
+def test_limit_shortens_timeouts():
+    connect, read = Deadline(2).limit((5, 30))
+
+    assert 0 < connect <= 2
+    assert 0 < read <= 2
+
+
+def test_limit_keeps_shorter_timeouts():
+    assert Deadline(60).limit((5, 30)) == (5, 30)
+
+
+def test_limit_raises_when_expired():
+    deadline = Deadline.at(time.time() - 1)
+
+    assert deadline.expired()
+    with pytest.raises(DeadlineExceededError):
+        deadline.limit((5, 30))
@@ -0,0 +1,65 @@
+"""
+This file is part of the vaccination.py.
+
+(c) 2021 Temuri Takalandze <me@abgeo.dev>
+
+For the full copyright and license information, please view the LICENSE
+file that was distributed with this source code.
+"""
+
+import threading
+import time
+
+import pytest
+
+from vaccination.core.prefetch import Prefetcher
+
+
+class Counter:
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def fetch(self, value: str) -> str:
+        with self.lock:
+            self.calls.append(value)
+        return value.upper()
+
+
+@pytest.fixture(name="counter")
+def fixture_counter():
+    return Counter()
+
+
+def test_get_reuses_prefetched_result(counter):
+    prefetcher = Prefetcher(ttl=10)
+
+    prefetcher.prefetch(counter.fetch, "a")
+    prefetcher.prefetch(counter.fetch, "a")
+
+    assert prefetcher.get(counter.fetch, "a") == "A"
+    assert prefetcher.get(counter.fetch, "a") == "A"
+    assert counter.calls == ["a"]
+    prefetcher.close()
+
+
+def test_get_without_prefetch_calls_synchronously(counter):
+    prefetcher = Prefetcher(ttl=10)
+
+    assert prefetcher.get(counter.fetch, "b") == "B"
+    assert counter.calls == ["b"]
+    prefetcher.close()
+
+
+def test_expired_entries_are_evicted(counter):
+    prefetcher = Prefetcher(ttl=0.1)
+    for value in "abc":
+        prefetcher.prefetch(counter.fetch, value)
+    time.sleep(0.2)
+
+    prefetcher.prefetch(counter.fetch, "d")
+
+    assert len(prefetcher._cache) == 1  # pylint: disable=protected-access
+    assert prefetcher.get(counter.fetch, "a") == "A"
+    assert counter.calls.count("a") == 2
+    prefetcher.close()
@@ -0,0 +1,55 @@
+"""
+This file is part of the vaccination.py.
+
+(c) 2021 Temuri Takalandze <me@abgeo.dev>
+
+For the full copyright and license information, please view the LICENSE
+file that was distributed with this source code.
+"""
+
+import io
+import json
+import os
+
+from vaccination.core.render import SlotTableRenderer
+
+DATES = [
+    {"dateName": f"2021-09-{day}", "weekName": "შაბათი", "slots": ["10:00", "10:30"]}
+    for day in range(10, 30)
+]
+
+
+class TTYStream(io.StringIO):
+    def isatty(self) -> bool:
+        return True
+
+
+def test_pager_asks_through_prompt(monkeypatch):
+    monkeypatch.setattr("shutil.get_terminal_size", lambda: os.terminal_size((80, 12)))
+    questions = []
+
+    def prompt(question):
+        questions.append(question)
+        return {question["name"]: "q"}
+
+    stream = TTYStream()
+    SlotTableRenderer(stream, "table", prompt).render(DATES)
+
+    assert [question["name"] for question in questions] == ["more"]
+    assert "2021-09-10" in stream.getvalue()
+    assert "2021-09-29" not in stream.getvalue()
+
+
+def test_json_output_is_not_interactive():
+    stream = TTYStream()
+    renderer = SlotTableRenderer(stream, "json", prompt=None)
+
+    renderer.render(DATES[:2])
+
+    assert not renderer.interactive
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert lines[0] == {
+        "date": "2021-09-10",
+        "week_day": "შაბათი",
+        "slots": ["10:00", "10:30"],
+    }
@@ -0,0 +1,122 @@
+"""
+This file is part of the vaccination.py.
+
+(c) 2021 Temuri Takalandze <me@abgeo.dev>
+
+For the full copyright and license information, please view the LICENSE
+file that was distributed with this source code.
+"""
+
+import json
+
+import pytest
+
+from vaccination.service.api.base import BaseAPIService
+from vaccination.service.api.transport import Transport, TransportResponse
+
+
+class CountingResponse(TransportResponse):
+    """
+    Response counting how often its body is decoded.
+    """
+
+    decoded = 0
+
+    def json(self) -> any:
+        CountingResponse.decoded += 1
+        return super().json()
+
+
+class FakeTransport(Transport):
+    """
+    Transport answering from a list of (status code, headers, body) tuples.
+    """
+
+    def __init__(self, *responses):
+        super().__init__()
+        self.responses = list(responses)
+        self.sent = []
+
+    def _send(self, method, url, timeout, **kwargs):
+        self.sent.append((method, url, kwargs.get("headers", {})))
+        status_code, headers, body = self.responses.pop(0)
+        content = json.dumps(body).encode() if body is not None else b""
+        return CountingResponse(status_code, headers, content, len(content))
+
+
+class Service(BaseAPIService):
+    url_template = "http://api$path"
+
+
+@pytest.fixture(autouse=True, name="reset_decoded")
+def fixture_reset_decoded():
+    CountingResponse.decoded = 0
+
+
+def _get(service: BaseAPIService, path: str = "/slots"):
+    return service._get(url={"path": path})  # pylint: disable=protected-access
+
+
+def test_validators_are_sent_and_304_returns_cached_object():
+    transport = FakeTransport(
+        (200, {"ETag": '"v1"', "Last-Modified": "Mon, 20 Sep 2021"}, [1, 2]),
+        (304, {}, None),
+    )
+    service = Service(transport)
+
+    first = _get(service)
+    second = _get(service)
+
+    assert second is first
+    assert transport.sent[0][2] == {}
+    assert transport.sent[1][2] == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Mon, 20 Sep 2021",
+    }
+    assert CountingResponse.decoded == 1
+
+
+def test_identical_body_is_not_decoded_again():
+    transport = FakeTransport((200, {}, [1, 2]), (200, {}, [1, 2]), (200, {}, [3]))
+    service = Service(transport)
+
+    first = _get(service)
+    second = _get(service)
+    third = _get(service)
+
+    assert second is first
+    assert third == [3]
+    assert CountingResponse.decoded == 2
+    assert transport.sent[1][2] == {}
+
+
+def test_least_recently_used_response_is_evicted():
+    transport = FakeTransport(*[(200, {"ETag": "e"}, [path]) for path in "abacb"])
+    service = Service(transport, response_cache_size=2)
+
+    _get(service, "/a")
+    _get(service, "/b")
+    _get(service, "/a")
+    _get(service, "/c")
+    _get(service, "/b")
+
+    assert [headers for _, _, headers in transport.sent] == [
+        {},
+        {},
+        {"If-None-Match": "e"},
+        {},
+        {},
+    ]
+
+
+def test_disabled_cache_remembers_nothing():
+    transport = FakeTransport((200, {"ETag": "e"}, [1]), (200, {"ETag": "e"}, [1]))
+    service = Service(transport, response_cache_size=0)
+
+    first = _get(service)
+    second = _get(service)
+
+    assert second == first
+    assert second is not first
+    assert transport.sent[1][2] == {}
+    assert not service._responses  # pylint: disable=protected-access
@@ -0,0 +1,137 @@
+"""
+This file is part of the vaccination.py.
+
+(c) 2021 Temuri Takalandze <me@abgeo.dev>
+
+For the full copyright and license information, please view the LICENSE
+file that was distributed with this source code.
+"""
+
+import time
+
+import pytest
+
+from vaccination.service.scan import WorkQueue, merge_results
+
+
+@pytest.fixture(name="queue")
+def fixture_queue(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue.db"), lease_timeout=0.2, max_attempts=2)
+    yield queue
+    queue.close()
+
+
+def _payload(branch: str) -> dict:
+    return {
+        "branch": branch,
+        "branch_name": f"Branch {branch}",
+        "region": "r1",
+        "municipality": "m1",
+    }
+
+
+def test_lease_hands_out_every_item_once(queue):
+    queue.put([_payload("b1"), _payload("b2")])
+
+    first = queue.lease("a")
+    second = queue.lease("b")
+
+    assert first[1]["branch"] == "b1"
+    assert second[1]["branch"] == "b2"
+    assert queue.lease("c") is None
+    assert queue.unfinished() == 2
+
+
+def test_expired_lease_is_handed_out_again(queue):
+    queue.put([_payload("b1")])
+    item_id, _ = queue.lease("a")
+    assert queue.lease("b") is None
+
+    time.sleep(0.3)
+
+    assert queue.lease("b")[0] == item_id
+
+
+def test_failed_item_is_retried_until_attempt_limit(queue):
+    queue.put([_payload("b1")])
+
+    item_id, _ = queue.lease("a")
+    assert queue.fail(item_id, "a", "first")
+    assert queue.items()[0]["status"] == "pending"
+
+    item_id, _ = queue.lease("a")
+    assert queue.fail(item_id, "a", "second")
+
+    item = queue.items()[0]
+    assert item["status"] == "failed"
+    assert item["attempts"] == 2
+    assert item["error"] == "second"
+    assert queue.lease("a") is None
+    assert queue.unfinished() == 0
+
+
+def test_expired_lease_over_attempt_limit_fails(queue):
+    queue.put([_payload("b1")])
+    queue.lease("a")
+    time.sleep(0.3)
+    queue.lease("b")
+    time.sleep(0.3)
+
+    assert queue.lease("c") is None
+    assert queue.items()[0]["status"] == "failed"
+
+
+def test_only_lease_owner_can_complete_or_fail(queue):
+    queue.put([_payload("b1")])
+    item_id, _ = queue.lease("slow")
+    time.sleep(0.3)
+    assert queue.lease("fast")[0] == item_id
+
+    assert not queue.complete(item_id, "slow", ["stale"])
+    assert not queue.fail(item_id, "slow", "late failure")
+    assert queue.items()[0]["status"] == "leased"
+
+    assert queue.complete(item_id, "fast", ["fresh"])
+    assert not queue.fail(item_id, "fast", "after completion")
+
+    item = queue.items()[0]
+    assert item["status"] == "done"
+    assert item["result"] == ["fresh"]
+
+
+def test_release_keeps_attempts(queue):
+    queue.put([_payload("b1")])
+    item_id, _ = queue.lease("a")
+
+    assert queue.release(item_id, "a")
+
+    item = queue.items()[0]
+    assert item["status"] == "pending"
+    assert item["attempts"] == 0
+
+
+def test_clear_removes_previous_scan(queue):
+    queue.put([_payload("b1")])
+    item_id, _ = queue.lease("a")
+    queue.complete(item_id, "a", [{"name": "room"}])
+
+    queue.clear()
+    queue.put([_payload("b1")])
+    item_id, _ = queue.lease("a")
+    queue.complete(item_id, "a", [{"name": "room"}])
+
+    branches = merge_results(queue.items())
+    assert branches["b1"]["rooms"] == [{"name": "room"}]
+    assert branches["b1"]["complete"]
+
+
+def test_merge_results_marks_unfinished_branches(queue):
+    queue.put([_payload("b1"), _payload("b2")])
+    item_id, _ = queue.lease("a")
+    queue.complete(item_id, "a", [{"name": "room"}])
+
+    branches = merge_results(queue.items())
+
+    assert branches["b1"]["complete"]
+    assert not branches["b2"]["complete"]
+    assert branches["b2"]["rooms"] == []
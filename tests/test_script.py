@@ -0,0 +1,119 @@
+"""
+This file is part of the vaccination.py.
+
+(c) 2021 Temuri Takalandze <me@abgeo.dev>
+
+For the full copyright and license information, please view the LICENSE
+file that was distributed with this source code.
+"""
+
+import pytest
+
+pytest.importorskip("PyInquirer")
+
+# pylint: disable=wrong-import-position
+from PyInquirer import Separator
+
+from vaccination.core.loadtest import run_load_test
+from vaccination.core.profiler import Profiler, profiler
+from vaccination.core.script import ScriptedAnswers, choice_containing, first_choice
+from vaccination.core.task.base import BaseTask
+
+QUESTION = {
+    "type": "list",
+    "name": "branch",
+    "choices": [
+        BaseTask.search_choice,
+        "ფილიალი 1",
+        "ფილიალი 2",
+        Separator("-" * 18),
+        BaseTask.back_choice,
+    ],
+}
+
+
+class PickTask(BaseTask):
+    """
+    Task asking for a branch and then for a confirmation.
+    """
+
+    def __init__(self):
+        self.steps = [[self._select_branch, {}], [self._confirm, {}]]
+
+    def _select_branch(self) -> dict:
+        branch = self._prompt(QUESTION).get("branch")
+        if not branch:
+            raise InterruptedError
+
+        return {"branch": branch}
+
+    def _confirm(self, branch: str) -> dict:
+        if not branch.startswith("ფილიალი"):
+            raise ValueError(branch)
+
+        return {} if self._ask_to_retry("გავაგრძელოთ?") is not None else None
+
+
+def test_answers_are_given_in_order():
+    answers = ScriptedAnswers(["first", lambda question: question["name"]])
+
+    assert answers({"name": "a"}) == {"a": "first"}
+    assert answers({"name": "b"}) == {"b": "b"}
+    assert answers({"name": "c"}) == {}
+
+
+def test_missing_answer_interrupts():
+    answers = ScriptedAnswers([None, first_choice()])
+
+    assert answers({"name": "a"}) == {}
+    assert answers({"type": "list", "name": "b", "choices": []}) == {}
+
+
+def test_first_choice_skips_navigation():
+    assert first_choice()(QUESTION) == "ფილიალი 1"
+
+
+def test_choice_containing():
+    assert choice_containing("2")(QUESTION) == "ფილიალი 2"
+    assert choice_containing("უკან")(QUESTION) is None
+
+
+def test_load_test_reports_flows_and_errors():
+    def script(user: int) -> ScriptedAnswers:
+        if user % 2:
+            return ScriptedAnswers([choice_containing("2"), True])
+        return ScriptedAnswers([lambda question: BaseTask.search_choice])
+
+    report = run_load_test(script, users=4, task=PickTask)
+
+    assert report["users"] == 4
+    assert report["flow"]["count"] == 2
+    assert len(report["errors"]) == 2
+    assert report["steps"]["PickTask._select_branch"]["count"] == 4
+    assert report["steps"]["PickTask._confirm"]["count"] == 4
+
+
+def test_load_test_restores_profiler():
+    saved = (profiler.enabled, profiler.stats, profiler.samples, profiler.events)
+
+    run_load_test(lambda _: ScriptedAnswers([first_choice(), True]), 2, PickTask)
+
+    assert (
+        profiler.enabled,
+        profiler.stats,
+        profiler.samples,
+        profiler.events,
+    ) == saved
+    assert profiler.stats is saved[1]
+
+
+def test_trace_events_need_an_output_file(tmp_path):
+    untraced = Profiler(enabled=True)
+    traced = Profiler(enabled=True, output=str(tmp_path / "trace.json"))
+    for instance in (untraced, traced):
+        with instance.step("step"):
+            with instance.measure("api", "/regions"):
+                pass
+
+    assert untraced.events == []
+    assert [event["name"] for event in traced.events] == ["/regions", "step"]
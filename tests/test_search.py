@@ -0,0 +1,117 @@
+"""
+This file is part of the vaccination.py.
+
+(c) 2021 Temuri Takalandze <me@abgeo.dev>
+
+For the full copyright and license information, please view the LICENSE
+file that was distributed with this source code.
+"""
+
+import pytest
+
+from vaccination.service.search import LocationIndex, normalize
+
+
+class FakeAPIService:
+    """
+    In-memory stand-in for the CommonData endpoints.
+    """
+
+    regions = [{"id": "r1", "geoName": "თბილისი"}, {"id": "r2", "geoName": "ბათუმი"}]
+    municipalities = {
+        "r1": [{"id": "m1", "geoName": "ვაკე-საბურთალო"}],
+        "r2": [{"id": "m2", "geoName": "ბათუმი"}],
+    }
+    branches = {
+        "m1": [{"id": "b1", "name": "კლინიკა თბილისი"}],
+        "m2": [{"id": "b2", "name": "რესპუბლიკური საავადმყოფო"}],
+    }
+
+    def __init__(self):
+        self.calls = []
+
+    def get_regions(self, service):
+        self.calls.append(("regions", service))
+        return self.regions
+
+    def get_municipalities(self, region, service):
+        self.calls.append(("municipalities", region, service))
+        return self.municipalities[region]
+
+    def get_municipality_branches(self, service, municipality):
+        self.calls.append(("branches", service, municipality))
+        return self.branches[municipality]
+
+
+@pytest.fixture(name="index")
+def fixture_index():
+    return LocationIndex.build(FakeAPIService(), "s1")
+
+
+def _labels(index: LocationIndex, query: str) -> list:
+    return [entry["label"] for entry in index.search(query)]
+
+
+def test_normalize_transliterates_georgian():
+    assert normalize("თბილისი") == "tbilisi"
+    assert normalize("ვაკე-საბურთალო") == "vake saburtalo"
+    assert normalize("  Tbilisi,  Vake ") == "tbilisi vake"
+    assert normalize("ჭიათურა შუა") == "chiatura shua"
+
+
+def test_build_walks_the_hierarchy(index):
+    assert [entry["kind"] for entry in index.entries] == [
+        "region",
+        "region",
+        "municipality",
+        "branch",
+        "municipality",
+        "branch",
+    ]
+    assert index.entries[3] == {
+        "region": ("თბილისი", "r1"),
+        "municipality": ("ვაკე-საბურთალო", "m1"),
+        "branch": ("კლინიკა თბილისი", "b1"),
+        "kind": "branch",
+        "label": "თბილისი / ვაკე-საბურთალო / კლინიკა თბილისი",
+    }
+
+
+def test_build_reuses_given_regions():
+    api_service = FakeAPIService()
+
+    LocationIndex.build(api_service, "s1", regions=api_service.regions[:1])
+
+    assert ("regions", "s1") not in api_service.calls
+    assert ("municipalities", "r2", "s1") not in api_service.calls
+
+
+@pytest.mark.parametrize("query", ["tbil", "თბილ", "Tbilisi", "tbilsi"])
+def test_search_by_prefix_script_and_typo(index, query):
+    assert _labels(index, query) == [
+        "თბილისი / ვაკე-საბურთალო / კლინიკა თბილისი",
+        "თბილისი",
+    ]
+
+
+def test_exact_word_ranks_first(index):
+    assert _labels(index, "batumi") == [
+        "ბათუმი / ბათუმი",
+        "ბათუმი",
+    ]
+
+
+def test_multi_word_query_matches_all_words(index):
+    assert _labels(index, "klinika tbil") == [
+        "თბილისი / ვაკე-საბურთალო / კლინიკა თბილისი"
+    ]
+    assert _labels(index, "საავადმყოფო რესპ") == [
+        "ბათუმი / ბათუმი / რესპუბლიკური საავადმყოფო"
+    ]
+    assert not _labels(index, "klinika batumi")
+
+
+def test_search_limit_and_no_match(index):
+    assert len(index.search("tbil", limit=1)) == 1
+    assert not index.search("kutaisi")
+    assert not index.search("")
@@ -0,0 +1,94 @@
+"""
+This file is part of the vaccination.py.
+
+(c) 2021 Temuri Takalandze <me@abgeo.dev>
+
+For the full copyright and license information, please view the LICENSE
+file that was distributed with this source code.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from vaccination.service.snapshot import SnapshotReader, write_snapshot
+
+WEEK_DAYS = {"2021-09-20": "ორშაბათი", "2021-09-21": "სამშაბათი"}
+
+
+def _record(branch: str, room: str, day: str, time: str) -> dict:
+    return {
+        "app": "def",
+        "service": "s1",
+        "region": "r1",
+        "municipality": "m1",
+        "branch": branch,
+        "branch_name": f"ფილიალი {branch}",
+        "room": room,
+        "date": day,
+        "week_day": WEEK_DAYS[day],
+        "time": time,
+    }
+
+
+RECORDS = [
+    _record("b1", "room 1", "2021-09-21", "10:30"),
+    _record("b1", "room 1", "2021-09-20", "09:00"),
+    _record("b1", "room 2", "2021-09-20", "11:00"),
+    _record("b2", "room 1", "2021-09-21", "14:00"),
+]
+
+
+@pytest.fixture(name="path")
+def fixture_path(tmp_path):
+    path = str(tmp_path / "slots.snapshot")
+    assert write_snapshot(path, RECORDS) == len(RECORDS)
+    return path
+
+
+def _key(record: dict) -> tuple:
+    return record["branch"], record["room"], record["date"], record["time"]
+
+
+def test_round_trip(path):
+    with SnapshotReader(path) as reader:
+        slots = list(reader.slots())
+
+        assert len(reader) == len(RECORDS)
+        assert len(list(reader.locations())) == 3
+
+    assert sorted(slots, key=_key) == sorted(RECORDS, key=_key)
+
+
+def test_slots_are_sorted_per_location(path):
+    with SnapshotReader(path) as reader:
+        times = [
+            (record["date"], record["time"])
+            for record in reader.slots(branch="b1")
+            if record["room"] == "room 1"
+        ]
+
+    assert times == [("2021-09-20", "09:00"), ("2021-09-21", "10:30")]
+
+
+def test_query_by_branch_and_time_range(path):
+    with SnapshotReader(path) as reader:
+        slots = list(
+            reader.slots(
+                branch="b1",
+                start=datetime(2021, 9, 20, 10),
+                end=datetime(2021, 9, 21, 10, 30),
+            )
+        )
+
+    assert [_key(record) for record in slots] == [
+        ("b1", "room 2", "2021-09-20", "11:00")
+    ]
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"\0" * 128)
+
+    with pytest.raises(ValueError):
+        SnapshotReader(str(path))
@@ -0,0 +1,156 @@
+"""
+This file is part of the vaccination.py.
+
+(c) 2021 Temuri Takalandze <me@abgeo.dev>
+
+For the full copyright and license information, please view the LICENSE
+file that was distributed with this source code.
+"""
+
+import pytest
+
+pytest.importorskip("PyInquirer")
+
+# pylint: disable=wrong-import-position
+from vaccination.core.script import ScriptedAnswers, choice_containing, first_choice
+from vaccination.core.task.base import BaseTask, SkipSteps
+from vaccination.core.task.vaccination import VaccinationTask
+
+
+class RecordingAnswers(ScriptedAnswers):
+    """
+    Scripted answers remembering the names of the asked questions.
+    """
+
+    def __init__(self, script):
+        super().__init__(script)
+        self.asked = []
+
+    def __call__(self, question):
+        self.asked.append(question["name"])
+        return super().__call__(question)
+
+
+class StepsTask(BaseTask):
+    """
+    Task whose first step can skip the second one.
+    """
+
+    def __init__(self):
+        self.steps = [
+            [self._first, {}],
+            [self._second, {}],
+            [self._third, {}],
+        ]
+
+    def _first(self):
+        if self._prompt({"name": "first"}).get("first") == "skip":
+            return SkipSteps({"value": "first"}, {"value": "skipped"})
+        return {"value": "first"}
+
+    def _second(self, value):
+        answer = self._prompt({"name": "second"}).get("second")
+        return {"value": f"{value}/{answer}"} if answer else None
+
+    def _third(self, value):
+        answer = self._prompt({"name": "third", "value": value}).get("third")
+        if not answer:
+            raise InterruptedError
+        return None if answer == BaseTask.back_choice else {"value": value}
+
+
+class FakeAPIService:
+    """
+    In-memory stand-in for BookingAPIService.
+    """
+
+    def get_available_quantities(self):
+        return {"pfizer": 10}
+
+    def get_service_types(self, app):
+        return [{"id": f"{app}-pfizer", "name": "Pfizer (Pfizer)"}] if app else []
+
+
+class FakeBookingService:
+    """
+    In-memory stand-in for AggregatedBookingService.
+    """
+
+    def get_regions(self, service):
+        del service
+        return [{"id": "r1", "geoName": "თბილისი"}]
+
+    def get_municipalities(self, region, service):
+        del service
+        return [{"id": f"{region}m1", "geoName": "ვაკე"}]
+
+    def get_municipality_branches(self, service, municipality):
+        del service
+        return [
+            {"id": f"{municipality}b1", "name": "კლინიკა 1"},
+            {"id": f"{municipality}b2", "name": "კლინიკა 2"},
+        ]
+
+    def get_slots(self, branch, region, service, start_date, end_date):
+        del region, service, start_date, end_date
+        return [{"name": f"room {branch}", "schedules": [{"dates": []}]}]
+
+    def close(self):
+        pass
+
+
+def test_skipped_steps_are_filled():
+    task = StepsTask()
+    task.answers = RecordingAnswers(["skip"])
+
+    assert task.run() == 0
+    assert task.answers.asked == ["first", "third"]
+    assert task.steps[1][1] == {"value": "skipped"}
+
+
+def test_back_after_skip_asks_the_skipped_step():
+    task = StepsTask()
+    task.answers = RecordingAnswers(["skip", BaseTask.back_choice, "z", "ok"])
+
+    assert task.run() == 0
+    assert task.answers.asked == ["first", "third", "second", "third"]
+    assert task.steps[2][1] == {"value": "first/z"}
+
+
+def test_back_returns_to_the_previous_step():
+    task = StepsTask()
+    task.answers = RecordingAnswers(["go", "x", BaseTask.back_choice, "y", "ok"])
+
+    assert task.run() == 0
+    assert task.answers.asked == ["first", "second", "third", "second", "third"]
+    assert task.steps[2][1] == {"value": "first/y"}
+
+
+def test_back_after_search_returns_to_the_branch_list():
+    task = VaccinationTask()
+    task.api_service = FakeAPIService()
+    task.booking = FakeBookingService()
+    task.answers = RecordingAnswers(
+        [
+            first_choice(),
+            lambda question: BaseTask.search_choice,
+            "კლინიკა 2",
+            first_choice(),
+            BaseTask.back_choice,
+            choice_containing("1"),
+            first_choice(),
+        ]
+    )
+
+    assert task.run() == 0
+    assert task.answers.asked == [
+        "service",
+        "region",
+        "query",
+        "entry",
+        "room",
+        "branch",
+        "room",
+        "retry",
+    ]
+    assert task.steps[3][1] == {"rooms": {"room r1m1b1": [{"dates": []}]}}
@@ -0,0 +1,229 @@
+"""
+This file is part of the vaccination.py.
+
+(c) 2021 Temuri Takalandze <me@abgeo.dev>
+
+For the full copyright and license information, please view the LICENSE
+file that was distributed with this source code.
+"""
+
+import gzip
+import json
+import selectors
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from vaccination.service.api.base import BaseAPIService
+from vaccination.service.api.transport import RequestsTransport, Transport
+
+BODY = json.dumps([{"id": str(i), "name": "ფილიალი"} for i in range(200)]).encode()
+
+
+class GzipHandler(BaseHTTPRequestHandler):
+    def do_GET(self):  # pylint: disable=invalid-name
+        content = gzip.compress(BODY)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(name="http1_server")
+def fixture_http1_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), GzipHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+class H2Server:
+    """
+    Plain-text HTTP/2 server answering every request after a delay.
+
+    Responses are delayed, so concurrent requests are only fast when they
+    are multiplexed over one connection.
+    """
+
+    delay = 0.3
+
+    def __init__(self):
+        # pylint: disable=import-outside-toplevel
+        import h2.config
+        import h2.connection
+        import h2.events
+
+        self.h2 = h2
+        self.connections = 0
+        self.max_open_streams = 0
+        self.listener = socket.create_server(("127.0.0.1", 0))
+        self.url = f"http://127.0.0.1:{self.listener.getsockname()[1]}"
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._running = False
+        self._thread.join()
+        self.listener.close()
+
+    def _serve(self):
+        selector = selectors.DefaultSelector()
+        selector.register(self.listener, selectors.EVENT_READ)
+        connections = {}
+        pending = []
+        while self._running:
+            for key, _ in selector.select(timeout=0.01):
+                if key.fileobj is self.listener:
+                    client, _ = self.listener.accept()
+                    self.connections += 1
+                    connection = self.h2.connection.H2Connection(
+                        config=self.h2.config.H2Configuration(client_side=False)
+                    )
+                    connection.initiate_connection()
+                    client.sendall(connection.data_to_send())
+                    connections[client] = connection
+                    selector.register(client, selectors.EVENT_READ)
+                    continue
+
+                client = key.fileobj
+                data = client.recv(65535)
+                if not data:
+                    selector.unregister(client)
+                    del connections[client]
+                    client.close()
+                    continue
+
+                connection = connections[client]
+                for event in connection.receive_data(data):
+                    if isinstance(event, self.h2.events.RequestReceived):
+                        pending.append((time.monotonic() + self.delay, client, event))
+                client.sendall(connection.data_to_send())
+
+            self.max_open_streams = max(self.max_open_streams, len(pending))
+            now = time.monotonic()
+            for item in [item for item in pending if item[0] <= now]:
+                pending.remove(item)
+                _, client, event = item
+                if client in connections:
+                    self._respond(client, connections[client], event.stream_id)
+
+        for client in connections:
+            client.close()
+
+    @staticmethod
+    def _respond(client, connection, stream_id):
+        content = gzip.compress(BODY)
+        connection.send_headers(
+            stream_id,
+            [
+                (":status", "200"),
+                ("content-type", "application/json"),
+                ("content-encoding", "gzip"),
+                ("content-length", str(len(content))),
+            ],
+        )
+        connection.send_data(stream_id, content, end_stream=True)
+        client.sendall(connection.data_to_send())
+
+
+@pytest.fixture(name="h2_server")
+def fixture_h2_server():
+    pytest.importorskip("h2")
+    server = H2Server()
+    yield server
+    server.close()
+
+
+def test_transport_is_abstract():
+    with pytest.raises(TypeError):
+        Transport()  # pylint: disable=abstract-class-instantiated
+
+
+def test_services_have_own_transports():
+    first, second = BaseAPIService(), BaseAPIService()
+
+    assert isinstance(first.transport, RequestsTransport)
+    assert first.transport is not second.transport
+
+
+def test_requests_transport_counts_compressed_bytes(http1_server):
+    transport = RequestsTransport()
+
+    response = transport.request("GET", http1_server, timeout=(5, 5))
+
+    assert response.json()[0]["id"] == "0"
+    assert response.decoded_bytes == len(BODY)
+    assert response.wire_bytes == len(gzip.compress(BODY))
+    assert transport.stats == {
+        "requests": 1,
+        "wire_bytes": response.wire_bytes,
+        "decoded_bytes": len(BODY),
+    }
+    transport.close()
+
+
+def test_service_accounts_bytes_per_path(http1_server):
+    class Service(BaseAPIService):
+        url_template = http1_server + "$path"
+
+    service = Service()
+
+    service._get(url={"path": "/regions"})  # pylint: disable=protected-access
+    service._get(url={"path": "/regions"})  # pylint: disable=protected-access
+    service._get(url={"path": "/branches"})  # pylint: disable=protected-access
+
+    wire_bytes = len(gzip.compress(BODY))
+    assert service.transfer_stats == {
+        "/regions": {
+            "requests": 2,
+            "wire_bytes": 2 * wire_bytes,
+            "decoded_bytes": 2 * len(BODY),
+        },
+        "/branches": {
+            "requests": 1,
+            "wire_bytes": wire_bytes,
+            "decoded_bytes": len(BODY),
+        },
+    }
+    service.close()
+
+
+def test_httpx_transport_multiplexes_over_http2(h2_server):
+    transport_module = pytest.importorskip("vaccination.service.api.transport")
+    if transport_module.httpx is None:
+        pytest.skip("httpx is not installed")
+    transport = transport_module.HTTPXTransport(http1=False)
+    requests_count = 8
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=requests_count) as executor:
+        responses = list(
+            executor.map(
+                lambda _: transport.request("GET", h2_server.url, timeout=(5, 5)),
+                range(requests_count),
+            )
+        )
+    duration = time.monotonic() - started
+    transport.close()
+
+    assert [response.json() for response in responses] == [
+        json.loads(BODY)
+    ] * requests_count
+    assert h2_server.connections == 1
+    assert h2_server.max_open_streams > 1
+    assert duration < requests_count * H2Server.delay / 2
+    assert transport.stats["requests"] == requests_count
+    assert transport.stats["decoded_bytes"] == requests_count * len(BODY)
+    assert transport.stats["wire_bytes"] < transport.stats["decoded_bytes"]
@@ -9,6 +9,7 @@ For the full copyright and license information, please view the LICENSE
 file that was distributed with this source code.
 """
 
+from vaccination.core.profiler import profiler
 from vaccination.core.task.main import MainTask
 
 
@@ -25,4 +26,8 @@ class App:
         :return: Exit code.
         """
 
-        return MainTask().run()
+        profiler.start()
+        try:
+            return MainTask().run()
+        finally:
+            profiler.report()
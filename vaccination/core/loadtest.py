@@ -0,0 +1,129 @@
+"""
+Load test harness module.
+
+Runs simulated users through the task flows concurrently, answering the
+prompts with ScriptedAnswers, and reports per-step latency percentiles and
+throughput.
+
+This file is part of the vaccination.py.
+
+(c) 2021 Temuri Takalandze <me@abgeo.dev>
+
+For the full copyright and license information, please view the LICENSE
+file that was distributed with this source code.
+"""
+
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, TextIO, Type
+
+from vaccination.core.profiler import profiler
+from vaccination.core.script import ScriptedAnswers
+from vaccination.core.task.main import MainTask
+from vaccination.service.api.base import BaseAPIService
+from vaccination.service.api.booking import BookingAPIService
+
+PERCENTILES = (50, 90, 99)
+
+
+def _summarize(values: List[float]) -> Dict[str, float]:
+    values = sorted(values)
+    summary = {"count": len(values), "max": values[-1] if values else 0.0}
+    for percentile in PERCENTILES:
+        # Nearest-rank percentile.
+        rank = max(0, -(-percentile * len(values) // 100) - 1)
+        summary[f"p{percentile}"] = values[rank] if values else 0.0
+
+    return summary
+
+
+def run_load_test(
+    script_factory: Callable[[int], ScriptedAnswers],
+    users: int = 10,
+    task: type = MainTask,
+    backends: Dict[Type[BaseAPIService], str] = None,
+    security_numbers_url: str = None,
+) -> Dict[str, any]:
+    """
+    Run simulated users through a task flow at the same time.
+
+    The backend settings are applied to the API service classes globally, so
+    the harness is meant to run in its own process.
+
+    :param script_factory: Creates the answer script of the N-th user.
+    :param int users: Number of concurrent users.
+    :param type task: Task class to run.
+    :param backends: URL templates by API service class, e.g.
+        {BookingAPIService: ..., LottoAPIService: ...} to target a gateway.
+    :param str security_numbers_url: Security numbers endpoint URL.
+    :return: Load test report.
+    """
+
+    for service, url_template in (backends or {}).items():
+        service.url_template = url_template
+    if security_numbers_url:
+        BookingAPIService.security_numbers_url = security_numbers_url
+
+    # Step timings are collected by the global profiler; its state is
+    # restored afterwards, so the load test does not leak into the report.
+    saved = (profiler.enabled, profiler.stats, profiler.samples, profiler.events)
+    profiler.enabled = True
+    profiler.stats, profiler.samples, profiler.events = {}, {}, []
+    flows = []
+    errors = []
+
+    def simulate(user: int) -> None:
+        instance = task()
+        instance.answers = script_factory(user)
+        started = time.perf_counter()
+        try:
+            instance.run()
+        except Exception as error:  # pylint: disable=broad-except
+            errors.append(repr(error))
+            return
+        flows.append(time.perf_counter() - started)
+
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=users) as executor:
+            list(executor.map(simulate, range(users)))
+        duration = time.perf_counter() - started
+        steps = {name: _summarize(values) for name, values in profiler.samples.items()}
+    finally:
+        profiler.enabled, profiler.stats, profiler.samples, profiler.events = saved
+
+    return {
+        "users": users,
+        "duration": duration,
+        "throughput": len(flows) / duration if duration else 0.0,
+        "errors": errors,
+        "flow": _summarize(flows),
+        "steps": steps,
+    }
+
+
+def print_report(report: Dict[str, any], stream: TextIO = sys.stdout) -> None:
+    """
+    Print load test report as a table.
+
+    :param report: Report returned by run_load_test().
+    :param stream: Output stream.
+    """
+
+    print(
+        f"{report['users']} users, {report['duration']:.2f} s, "
+        f"{report['throughput']:.2f} flows/s, {len(report['errors'])} errors",
+        file=stream,
+    )
+    header = " ".join(f"{f'p{percentile}':>9}" for percentile in PERCENTILES)
+    print(f"\n{'step':<50} {'count':>5} {header} {'max':>9}", file=stream)
+    rows = dict(report["steps"], flow=report["flow"])
+    for name, summary in rows.items():
+        values = " ".join(
+            f"{summary[f'p{percentile}']:>9.3f}" for percentile in PERCENTILES
+        )
+        print(
+            f"{name:<50} {summary['count']:>5} {values} {summary['max']:>9.3f}",
+            file=stream,
+        )
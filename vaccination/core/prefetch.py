@@ -0,0 +1,101 @@
+"""
+Speculative prefetch module.
+
+This file is part of the vaccination.py.
+
+(c) 2021 Temuri Takalandze <me@abgeo.dev>
+
+For the full copyright and license information, please view the LICENSE
+file that was distributed with this source code.
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Tuple
+
+
+class Prefetcher:
+    """
+    Runs calls in the background with bounded concurrency and keeps their
+    results in a short-lived cache, so the next step can read them instantly.
+    """
+
+    def __init__(self, max_workers: int = 4, ttl: float = 60):
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._cache: Dict[Tuple, Tuple[float, Future]] = {}
+        self._lock = threading.Lock()
+
+    def _purge(self, now: float) -> None:
+        # Called with the lock held: drop expired results and pending calls
+        # that nobody asked for in time.
+        for key, (created, future) in list(self._cache.items()):
+            if now - created >= self.ttl:
+                future.cancel()
+                del self._cache[key]
+
+    @staticmethod
+    def _key(function: Callable, args: tuple, kwargs: dict) -> Tuple:
+        return (function.__qualname__,) + args + tuple(sorted(kwargs.items()))
+
+    def prefetch(self, function: Callable, *args, **kwargs) -> None:
+        """
+        Schedule a background call unless a fresh result is already cached.
+
+        :param function: Function to call.
+        """
+
+        key = self._key(function, args, kwargs)
+        now = time.monotonic()
+        with self._lock:
+            self._purge(now)
+            cached = self._cache.get(key)
+            if cached is not None:
+                return
+            try:
+                future = self._executor.submit(function, *args, **kwargs)
+            except RuntimeError:
+                return
+            self._cache[key] = (now, future)
+
+    def get(self, function: Callable, *args, **kwargs) -> any:
+        """
+        Get the result of a call, using the prefetched one when available.
+
+        Calls that were not prefetched, have expired or have failed in the
+        background are made synchronously.
+
+        :param function: Function to call.
+        :return: Function result.
+        """
+
+        key = self._key(function, args, kwargs)
+        with self._lock:
+            self._purge(time.monotonic())
+            cached = self._cache.pop(key, None)
+
+        if cached is not None:
+            created, future = cached
+            if future.cancel():
+                return function(*args, **kwargs)
+            try:
+                result = future.result()
+            except Exception:  # pylint: disable=broad-except
+                return function(*args, **kwargs)
+            with self._lock:
+                self._cache.setdefault(key, (created, future))
+            return result
+
+        return function(*args, **kwargs)
+
+    def close(self) -> None:
+        """
+        Stop the background workers and drop pending calls.
+        """
+
+        with self._lock:
+            for _, future in self._cache.values():
+                future.cancel()
+            self._cache.clear()
+        self._executor.shutdown(wait=False)
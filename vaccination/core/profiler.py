@@ -0,0 +1,221 @@
+"""
+Step profiler module.
+
+Profiling is configured with environment variables:
+
+* VACCINATION_PROFILE - comma-separated options: "1" enables step timing,
+  "cprofile" and "tracemalloc" additionally enable the respective tools.
+* VACCINATION_PROFILE_OUTPUT - path of a Chrome trace file to write at exit.
+
+This file is part of the vaccination.py.
+
+(c) 2021 Temuri Takalandze <me@abgeo.dev>
+
+For the full copyright and license information, please view the LICENSE
+file that was distributed with this source code.
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import TextIO
+
+
+class Profiler:  # pylint: disable=too-many-instance-attributes
+    """
+    Collects per-step wall time and the time spent waiting on the user
+    ("prompt") and on the API ("api").
+    """
+
+    kinds = ("prompt", "api")
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        use_cprofile: bool = False,
+        use_tracemalloc: bool = False,
+        output: str = None,
+    ):
+        self.enabled = enabled or use_cprofile or use_tracemalloc
+        self.use_cprofile = use_cprofile
+        self.use_tracemalloc = use_tracemalloc
+        self.output = output
+        self.stats = {}
+        self.samples = {}
+        self.events = []
+        self._stack = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._profile = None
+
+    @classmethod
+    def from_environment(cls) -> "Profiler":
+        """
+        Create profiler configured by the environment variables.
+
+        :return: Profiler instance.
+        """
+
+        options = {
+            option.strip()
+            for option in os.environ.get("VACCINATION_PROFILE", "").lower().split(",")
+            if option.strip() and option.strip() != "0"
+        }
+
+        return cls(
+            enabled=bool(options),
+            use_cprofile="cprofile" in options,
+            use_tracemalloc="tracemalloc" in options,
+            output=os.environ.get("VACCINATION_PROFILE_OUTPUT"),
+        )
+
+    def start(self) -> None:
+        """
+        Start the optional cProfile and tracemalloc capture.
+        """
+
+        if self.use_cprofile:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        if self.use_tracemalloc:
+            tracemalloc.start()
+
+    @contextmanager
+    def step(self, name: str):
+        """
+        Measure a task step.
+
+        :param str name: Step name.
+        """
+
+        if not self.enabled:
+            yield
+            return
+
+        record = {"wall": 0.0, "prompt": 0.0, "api": 0.0}
+        with self._lock:
+            self._stack.append((threading.get_ident(), record))
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            finished = time.perf_counter()
+            record["wall"] = finished - started
+            with self._lock:
+                self._stack = [item for item in self._stack if item[1] is not record]
+                stats = self.stats.setdefault(
+                    name, {"calls": 0, "wall": 0.0, "prompt": 0.0, "api": 0.0}
+                )
+                stats["calls"] += 1
+                for key, value in record.items():
+                    stats[key] += value
+                self.samples.setdefault(name, []).append(record["wall"])
+                self._add_event(name, "step", started, finished)
+
+    @contextmanager
+    def measure(self, kind: str, name: str = None):
+        """
+        Attribute the time of the wrapped block to the current step.
+
+        Blocks that run in background threads only appear in the trace file.
+        The block can add details, e.g. transferred bytes, to the yielded
+        dictionary; they are written as the arguments of the trace event.
+
+        :param str kind: One of the Profiler.kinds.
+        :param str name: Event name for the trace file.
+        """
+
+        details = {}
+        if not self.enabled:
+            yield details
+            return
+
+        started = time.perf_counter()
+        try:
+            yield details
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                for thread, record in reversed(self._stack):
+                    if thread == threading.get_ident():
+                        record[kind] += finished - started
+                        break
+                self._add_event(name or kind, kind, started, finished, details)
+
+    def _add_event(
+        self,
+        name: str,
+        category: str,
+        started: float,
+        finished: float,
+        details: dict = None,
+    ):
+        # Trace events are only kept when there is a trace file to write.
+        if not self.output:
+            return
+
+        self.events.append(
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": (started - self._origin) * 1e6,
+                "dur": (finished - started) * 1e6,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": details or {},
+            }
+        )
+
+    def report(self, stream: TextIO = sys.stderr) -> None:
+        """
+        Print the summary report and write the trace file.
+
+        :param stream: Output stream for the report.
+        """
+
+        if not self.enabled:
+            return
+
+        print("\nStep timings (seconds):", file=stream)
+        print(
+            f"{'step':<50} {'calls':>5} {'wall':>9} {'prompt':>9} {'api':>9} "
+            f"{'other':>9}",
+            file=stream,
+        )
+        for name, stats in sorted(
+            self.stats.items(), key=lambda item: item[1]["wall"], reverse=True
+        ):
+            other = stats["wall"] - stats["prompt"] - stats["api"]
+            print(
+                f"{name:<50} {stats['calls']:>5} {stats['wall']:>9.3f} "
+                f"{stats['prompt']:>9.3f} {stats['api']:>9.3f} {other:>9.3f}",
+                file=stream,
+            )
+
+        if self._profile is not None:
+            self._profile.disable()
+            print("\ncProfile (top 20 by cumulative time):", file=stream)
+            pstats.Stats(self._profile, stream=stream).sort_stats(
+                "cumulative"
+            ).print_stats(20)
+
+        if self.use_tracemalloc and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            print("\ntracemalloc (top 10 by size):", file=stream)
+            for statistic in snapshot.statistics("lineno")[:10]:
+                print(statistic, file=stream)
+
+        if self.output:
+            with open(self.output, "w", encoding="utf-8") as file:
+                json.dump({"traceEvents": self.events}, file)
+
+
+profiler = Profiler.from_environment()
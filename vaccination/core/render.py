@@ -0,0 +1,149 @@
+"""
+Slot table renderer module.
+
+The output format is configured with the VACCINATION_OUTPUT environment
+variable: "table" (default) or "json" for machine-readable JSON lines.
+
+This file is part of the vaccination.py.
+
+(c) 2021 Temuri Takalandze <me@abgeo.dev>
+
+For the full copyright and license information, please view the LICENSE
+file that was distributed with this source code.
+"""
+
+import json
+import os
+import shutil
+import sys
+from typing import Callable, Dict, Iterable, Iterator, List, TextIO
+
+
+def _input_prompt(question: Dict[str, any]) -> Dict[str, str]:
+    return {question["name"]: input(question["message"])}
+
+
+class SlotTableRenderer:
+    """
+    Streams slot dates as a table without measuring every cell up front.
+
+    The date and weekday columns are narrow, so only they are measured; the
+    slot list is wrapped into the remaining width. Output taller than the
+    terminal is paged when writing to a TTY.
+    """
+
+    header = ["თარიღი", "დღე", "თავისუფალი დროები"]
+    min_width = 60
+
+    def __init__(
+        self,
+        stream: TextIO = sys.stdout,
+        output_format: str = None,
+        prompt: Callable[[Dict], Dict] = _input_prompt,
+    ):
+        """
+        :param stream: Output stream.
+        :param str output_format: "table" or "json", defaults to VACCINATION_OUTPUT.
+        :param prompt: Asks the pager question, e.g. BaseTask._prompt.
+        """
+
+        self.stream = stream
+        self.output_format = output_format or os.environ.get(
+            "VACCINATION_OUTPUT", "table"
+        )
+        self.prompt = prompt
+
+    @property
+    def interactive(self) -> bool:
+        """
+        Check whether the output is meant for a human.
+
+        :return: False for machine-readable output.
+        """
+
+        return self.output_format != "json"
+
+    def render(self, dates: List[Dict[str, any]]) -> None:
+        """
+        Render the dates with their free slots.
+
+        :param dates: Dates with "dateName", "weekName" and "slots" keys.
+        """
+
+        if not self.interactive:
+            for item in dates:
+                self.stream.write(
+                    json.dumps(
+                        {
+                            "date": item["dateName"],
+                            "week_day": item["weekName"],
+                            "slots": item["slots"],
+                        },
+                        ensure_ascii=False,
+                    )
+                    + "\n"
+                )
+            return
+
+        columns, lines = shutil.get_terminal_size()
+        pager = self.stream.isatty()
+        printed = 0
+        self.stream.write("\n")
+        for line in self._lines(dates, max(columns - 10, self.min_width)):
+            if pager and printed >= lines - 2:
+                answer = self.prompt(
+                    {
+                        "type": "input",
+                        "name": "more",
+                        "message": "-- მეტი (Enter / q) --",
+                    }
+                ).get("more")
+                if answer is None or answer.strip().lower() == "q":
+                    break
+                printed = 0
+            self.stream.write(line + "\n")
+            printed += 1
+        self.stream.write("\n")
+
+    def _lines(self, dates: List[Dict[str, any]], width: int) -> Iterator[str]:
+        widths = [len(self.header[0]), len(self.header[1])]
+        for item in dates:
+            widths[0] = max(widths[0], len(item["dateName"]))
+            widths[1] = max(widths[1], len(item["weekName"]))
+        # Borders and padding take 10 characters in a 3-column table.
+        widths.append(max(len(self.header[2]), width - sum(widths) - 10))
+
+        rule = "+" + "+".join("-" * (column + 2) for column in widths) + "+"
+        yield rule
+        yield self._row(self.header, widths)
+        yield rule
+        for item in dates:
+            slot_lines = list(self._wrap(item["slots"], widths[2])) or [""]
+            first = [item["dateName"], item["weekName"], slot_lines[0]]
+            yield self._row(first, widths)
+            for slot_line in slot_lines[1:]:
+                yield self._row(["", "", slot_line], widths)
+            yield rule
+
+    @staticmethod
+    def _row(cells: List[str], widths: List[int]) -> str:
+        return (
+            "| "
+            + " | ".join(cell.ljust(width) for cell, width in zip(cells, widths))
+            + " |"
+        )
+
+    @staticmethod
+    def _wrap(slots: Iterable[str], width: int) -> Iterator[str]:
+        line = ""
+        for slot in slots:
+            if not line:
+                line = slot
+            # Keep room for the trailing comma of a wrapped line.
+            elif len(line) + len(slot) + 2 < width:
+                line += ", " + slot
+            else:
+                yield line + ","
+                line = slot
+        if line:
+            yield line
@@ -0,0 +1,80 @@
+"""
+Scripted answers module.
+
+This file is part of the vaccination.py.
+
+(c) 2021 Temuri Takalandze <me@abgeo.dev>
+
+For the full copyright and license information, please view the LICENSE
+file that was distributed with this source code.
+"""
+
+from typing import Callable, Dict, Iterable, Union
+
+from vaccination.core.task.base import BaseTask
+
+
+class ScriptedAnswers:
+    """
+    Non-interactive answer provider for the task step engine.
+
+    Every script item answers one question, in order. An item is either the
+    answer value itself or a callable that receives the question and returns
+    the value, e.g. first_choice() for list questions whose choices are only
+    known at run time. When the script runs out, the task is interrupted.
+    """
+
+    def __init__(self, script: Iterable[Union[any, Callable[[Dict], any]]]):
+        self.script = list(script)
+        self.position = 0
+
+    def __call__(self, question: Dict[str, any]) -> Dict[str, any]:
+        if self.position >= len(self.script):
+            return {}
+
+        answer = self.script[self.position]
+        self.position += 1
+        if callable(answer):
+            answer = answer(question)
+
+        return {question["name"]: answer} if answer is not None else {}
+
+
+def _selectable(question: Dict[str, any]) -> list:
+    return [
+        choice
+        for choice in question.get("choices", [])
+        if isinstance(choice, str)
+        and choice not in (BaseTask.back_choice, BaseTask.search_choice)
+    ]
+
+
+def first_choice() -> Callable[[Dict], str]:
+    """
+    Script item that selects the first choice of a list question.
+
+    :return: Answer callable.
+    """
+
+    def answer(question: Dict[str, any]) -> Union[str, None]:
+        choices = _selectable(question)
+        return choices[0] if choices else None
+
+    return answer
+
+
+def choice_containing(text: str) -> Callable[[Dict], str]:
+    """
+    Script item that selects the first choice containing the given text.
+
+    :param str text: Text to look for.
+    :return: Answer callable.
+    """
+
+    def answer(question: Dict[str, any]) -> Union[str, None]:
+        for choice in _selectable(question):
+            if text in choice:
+                return choice
+        return None
+
+    return answer
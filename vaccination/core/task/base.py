@@ -11,6 +11,20 @@ from typing import List, Dict
 
 from PyInquirer import style_from_dict, Token, Separator, prompt
 
+from vaccination.core.profiler import profiler
+
+
+class SkipSteps:
+    """
+    Step result that also provides the outputs of the following steps.
+
+    The step engine stores all outputs and continues after the last one, as
+    if the skipped steps had been answered.
+    """
+
+    def __init__(self, *outputs: Dict[str, any]):
+        self.outputs = outputs
+
 
 class BaseTask:
     """
@@ -29,7 +43,10 @@ class BaseTask:
         }
     )
     back_choice = "<< უკან დაბრუნება"
+    search_choice = ">> ძებნა"
     steps = []
+    # Answer provider used instead of the interactive prompt, e.g. ScriptedAnswers.
+    answers = None
 
     def _dict_to_choices(
         self, raw: Dict[str, any], navigation: bool = True
@@ -39,15 +56,21 @@ class BaseTask:
             choices + [Separator("-" * 18), self.back_choice] if navigation else choices
         )
 
+    def _prompt(self, question: Dict[str, any]) -> Dict[str, any]:
+        with profiler.measure("prompt", question.get("name")):
+            if self.answers is not None:
+                return self.answers(question)
+
+            return prompt(question, style=self.style)
+
     def _ask_to_retry(self, message: str, default: bool = False) -> bool:
-        answers = prompt(
+        answers = self._prompt(
             {
                 "type": "confirm",
                 "message": message,
                 "name": "retry",
                 "default": default,
-            },
-            style=self.style,
+            }
         )
 
         return answers.get("retry")
@@ -63,8 +86,10 @@ class BaseTask:
         while i < len(self.steps):
             input_data = self.steps[i - 1][1] if i != 0 else {}
 
+            step = self.steps[i][0]
             try:
-                output_data = self.steps[i][0](**input_data)
+                with profiler.step(f"{type(self).__name__}.{step.__name__}"):
+                    output_data = step(**input_data)
             except InterruptedError:
                 return 0
 
@@ -72,6 +97,12 @@ class BaseTask:
                 i = i - 1
                 continue
 
+            if isinstance(output_data, SkipSteps):
+                for output_data in output_data.outputs:
+                    self.steps[i][1] = output_data
+                    i = i + 1
+                continue
+
             self.steps[i][1] = output_data
             i = i + 1
 
@@ -10,7 +10,6 @@ file that was distributed with this source code.
 from typing import Dict, Union
 
 import regex
-from PyInquirer import prompt
 from prompt_toolkit.validation import Validator, ValidationError
 
 from vaccination.core.task.base import BaseTask
@@ -38,14 +37,13 @@ class LottoTask(BaseTask):
         ]
 
     def _ask_personal_number(self) -> Dict[str, str]:
-        answers = prompt(
+        answers = self._prompt(
             {
                 "type": "input",
                 "name": "personal_number",
                 "message": "აკრიფეთ პირადი ნომერი",
                 "validate": _PersonalNumberValidator,
-            },
-            style=self.style,
+            }
         )
 
         personal_number = answers.get("personal_number")
@@ -9,8 +9,6 @@ file that was distributed with this source code.
 
 from typing import Dict
 
-from PyInquirer import prompt
-
 from vaccination.core.task.base import BaseTask
 from vaccination.core.task.lotto import LottoTask
 from vaccination.core.task.vaccination import VaccinationTask
@@ -34,14 +32,13 @@ class MainTask(BaseTask):
             "ჯავშნის შემოწმება": VaccinationCheckTask,
             "ლოტო": LottoTask,
         }
-        answers = prompt(
+        answers = self._prompt(
             {
                 "type": "list",
                 "name": "task",
                 "message": "აირჩიეთ სერვისი",
                 "choices": self._dict_to_choices(tasks, False),
-            },
-            style=self.style,
+            }
         )
 
         task = answers.get("task")
@@ -50,6 +47,7 @@ class MainTask(BaseTask):
 
         return {"task": tasks[task]}
 
-    @staticmethod
-    def _run_task(task: callable) -> Dict[str, str]:
-        return task().run()
+    def _run_task(self, task: callable) -> Dict[str, str]:
+        task = task()
+        task.answers = self.answers
+        return task.run()
@@ -9,15 +9,15 @@ file that was distributed with this source code.
 
 import copy
 import datetime
-import os
 from datetime import date
-from typing import List, Dict, Union
+from typing import List, Dict, Tuple, Union
 
-from PyInquirer import prompt
-from prettytable import PrettyTable, ALL
-
-from vaccination.core.task.base import BaseTask
+from vaccination.core.prefetch import Prefetcher
+from vaccination.core.render import SlotTableRenderer
+from vaccination.core.task.base import BaseTask, SkipSteps
+from vaccination.service.aggregate import AggregatedBookingService
 from vaccination.service.api.booking import BookingAPIService
+from vaccination.service.search import LocationIndex
 
 
 class VaccinationTask(BaseTask):
@@ -25,8 +25,13 @@ class VaccinationTask(BaseTask):
     Vaccination CLI Task.
     """
 
+    prefetch_branches = 3
+
     def __init__(self):
         self.api_service = BookingAPIService()
+        self.booking = AggregatedBookingService(self.api_service)
+        self.prefetcher = Prefetcher()
+        self.search_indexes = {}
         self.steps = [
             [self._select_service, {}],
             [self._select_region, {}],
@@ -36,6 +41,115 @@ class VaccinationTask(BaseTask):
             [self._print_result, {}],
         ]
 
+    @staticmethod
+    def _get_period() -> Tuple[date, date]:
+        start_date = date.today()
+        return start_date, start_date + datetime.timedelta(days=7)
+
+    def run(self) -> int:
+        """
+        Run task and stop the background workers afterwards.
+
+        :return: Exit code.
+        """
+
+        try:
+            return super().run()
+        finally:
+            self.prefetcher.close()
+            self.booking.close()
+
+    def _get_municipalities(self, service: str, region: str) -> Dict[str, any]:
+        municipalities = {}
+        for municipality in self.prefetcher.get(
+            self.booking.get_municipalities, region, service
+        ):
+            municipalities[municipality["geoName"]] = municipality["id"]
+
+        return {
+            "service": service,
+            "region": region,
+            "municipalities": municipalities,
+        }
+
+    def _get_branches(
+        self, service: str, region: str, municipality: str
+    ) -> Dict[str, any]:
+        branches = {}
+        for branch in self.prefetcher.get(
+            self.booking.get_municipality_branches, service, municipality
+        ):
+            branches[branch["name"]] = branch["id"]
+
+        return {
+            "region": region,
+            "service": service,
+            "branches": branches,
+        }
+
+    def _get_rooms(self, service: str, region: str, branch: str) -> Dict[str, any]:
+        start_date, end_date = self._get_period()
+        rooms = {}
+        for room in self.prefetcher.get(
+            self.booking.get_slots, branch, region, service, start_date, end_date
+        ):
+            rooms[room["name"]] = room["schedules"]
+
+        return {"rooms": rooms}
+
+    def _build_search_index(
+        self, service: str, regions: Tuple[Tuple[str, str], ...]
+    ) -> LocationIndex:
+        return LocationIndex.build(
+            self.booking,
+            service,
+            self.prefetcher.get,
+            regions=[{"geoName": name, "id": region} for name, region in regions],
+        )
+
+    def _search(
+        self, service: str, regions: Dict[str, str]
+    ) -> Union[Dict[str, any], None]:
+        answers = self._prompt(
+            {
+                "type": "input",
+                "name": "query",
+                "message": "აკრიფეთ რეგიონის, რაიონის ან დაწესებულების სახელი",
+            }
+        )
+
+        query = answers.get("query")
+        if not query:
+            return None
+
+        if service not in self.search_indexes:
+            self.search_indexes[service] = self.prefetcher.get(
+                self._build_search_index, service, tuple(regions.items())
+            )
+
+        entries = {
+            entry["label"]: entry
+            for entry in self.search_indexes[service].search(query)
+        }
+        if not entries:
+            print("\033[91mვერაფერი მოიძებნა\033[0m")
+            return None
+
+        answers = self._prompt(
+            {
+                "type": "list",
+                "name": "entry",
+                "message": "ძებნის შედეგები",
+                "choices": self._dict_to_choices(entries),
+            }
+        )
+
+        entry = answers.get("entry")
+        if not entry:
+            raise InterruptedError
+
+        return None if entry == self.back_choice else entries[entry]
+
     def _select_service(self) -> Dict[str, str]:
         quantities = self.api_service.get_available_quantities()
         services = {}
@@ -46,14 +160,13 @@ class VaccinationTask(BaseTask):
                 key += f" ({quantities[key.lower()]:,})"
                 services[key] = service["id"]
 
-        answers = prompt(
+        answers = self._prompt(
             {
                 "type": "list",
                 "name": "service",
                 "message": "აირჩიეთ ვაქცინა",
                 "choices": self._dict_to_choices(services, False),
-            },
-            style=self.style,
+            }
         )
 
         service = answers.get("service")
@@ -61,22 +174,29 @@ class VaccinationTask(BaseTask):
             raise InterruptedError
 
         regions = {}
-        for region in self.api_service.get_regions(services[service]):
+        for region in self.booking.get_regions(services[service]):
             regions[region["geoName"]] = region["id"]
 
         return {"service": services[service], "regions": regions}
 
     def _select_region(
         self, service: str, regions: Dict[str, str]
-    ) -> Union[Dict[str, Union[str, Dict[str, str]]], None]:
-        answers = prompt(
+    ) -> Union[Dict[str, Union[str, Dict[str, str]]], SkipSteps, None]:
+        for region in regions.values():
+            self.prefetcher.prefetch(self.booking.get_municipalities, region, service)
+        if service not in self.search_indexes:
+            # Build the search index in the background from the prefetched data.
+            self.prefetcher.prefetch(
+                self._build_search_index, service, tuple(regions.items())
+            )
+
+        answers = self._prompt(
             {
                 "type": "list",
                 "name": "region",
                 "message": "სერვისის ჩატარების რეგიონი",
-                "choices": self._dict_to_choices(regions),
-            },
-            style=self.style,
+                "choices": [self.search_choice] + self._dict_to_choices(regions),
+            }
         )
 
         region = answers.get("region")
@@ -86,29 +206,39 @@ class VaccinationTask(BaseTask):
         if region == self.back_choice:
             return None
 
-        municipalities = {}
-        for municipality in self.api_service.get_municipalities(
-            regions[region], service
-        ):
-            municipalities[municipality["geoName"]] = municipality["id"]
+        if region == self.search_choice:
+            entry = self._search(service, regions)
+            if entry is None:
+                return self._select_region(service, regions)
 
-        return {
-            "service": service,
-            "region": regions[region],
-            "municipalities": municipalities,
-        }
+            region = entry["region"][1]
+            outputs = [self._get_municipalities(service, region)]
+            if "municipality" in entry:
+                outputs.append(
+                    self._get_branches(service, region, entry["municipality"][1])
+                )
+            if "branch" in entry:
+                outputs.append(self._get_rooms(service, region, entry["branch"][1]))
+
+            return SkipSteps(*outputs)
+
+        return self._get_municipalities(service, regions[region])
 
     def _select_municipality(
         self, service: str, region: str, municipalities: Dict[str, str]
     ) -> Union[Dict[str, Union[str, Dict[str, str]]], None]:
-        answers = prompt(
+        for municipality in municipalities.values():
+            self.prefetcher.prefetch(
+                self.booking.get_municipality_branches, service, municipality
+            )
+
+        answers = self._prompt(
             {
                 "type": "list",
                 "name": "municipality",
                 "message": "სერვისის ჩატარების რაიონი",
                 "choices": self._dict_to_choices(municipalities),
-            },
-            style=self.style,
+            }
         )
 
         municipality = answers.get("municipality")
@@ -118,29 +248,29 @@ class VaccinationTask(BaseTask):
         if municipality == self.back_choice:
             return None
 
-        branches = {}
-        for branch in self.api_service.get_municipality_branches(
-            service, municipalities[municipality]
-        ):
-            branches[branch["name"]] = branch["id"]
-
-        return {
-            "region": region,
-            "service": service,
-            "branches": branches,
-        }
+        return self._get_branches(service, region, municipalities[municipality])
 
     def _select_branch(
         self, region: str, service: str, branches: Dict[str, str]
     ) -> Union[Dict[str, Dict[str, List]], None]:
-        answers = prompt(
+        start_date, end_date = self._get_period()
+        for branch in list(branches.values())[: self.prefetch_branches]:
+            self.prefetcher.prefetch(
+                self.booking.get_slots,
+                branch,
+                region,
+                service,
+                start_date,
+                end_date,
+            )
+
+        answers = self._prompt(
             {
                 "type": "list",
                 "name": "branch",
                 "message": "სერვისის მიმწოდებელი დაწესებულება",
                 "choices": self._dict_to_choices(branches),
-            },
-            style=self.style,
+            }
         )
 
         branch = answers.get("branch")
@@ -150,26 +280,16 @@ class VaccinationTask(BaseTask):
         if branch == self.back_choice:
             return None
 
-        start_date = date.today()
-        end_date = start_date + datetime.timedelta(days=7)
-
-        rooms = {}
-        for room in self.api_service.get_slots(
-            branches[branch], region, service, start_date, end_date
-        ):
-            rooms[room["name"]] = room["schedules"]
-
-        return {"rooms": rooms}
+        return self._get_rooms(service, region, branches[branch])
 
     def _select_room(self, rooms: Dict[str, List]) -> Union[Dict[str, List], None]:
-        answers = prompt(
+        answers = self._prompt(
             {
                 "type": "list",
                 "name": "room",
                 "message": "აირჩიეთ კაბინეტი",
                 "choices": self._dict_to_choices(rooms),
-            },
-            style=self.style,
+            }
         )
 
         room = answers.get("room")
@@ -186,19 +306,9 @@ class VaccinationTask(BaseTask):
         return {"dates": dates}
 
     def _print_result(self, dates: List) -> Union[Dict, None]:
-        _, columns = os.popen("stty size", "r").read().split()
-        header = ["თარიღი", "დღე", "თავისუფალი დროები"]
-        table = PrettyTable(
-            header,
-            hrules=ALL,
-            align="l",
-            min_width=60,
-            max_table_width=int(columns) - 10,
-        )
-        table.add_rows(
-            map(lambda x: [x["dateName"], x["weekName"], ", ".join(x["slots"])], dates)
-        )
-
-        print(f"\n{table}\n")
+        renderer = SlotTableRenderer(prompt=self._prompt)
+        renderer.render(dates)
+        if not renderer.interactive:
+            return {}
 
         return None if self._ask_to_retry("გსურთ სხვა კაბინეტის ნახვა?") else {}
@@ -10,7 +10,6 @@ file that was distributed with this source code.
 from typing import Dict, Union
 
 import regex
-from PyInquirer import prompt
 from prettytable import PrettyTable, NONE
 from prompt_toolkit.validation import Validator, ValidationError
 
@@ -58,14 +57,13 @@ class VaccinationCheckTask(BaseTask):
         ]
 
     def _ask_number(self, message: str, validator) -> str:
-        answers = prompt(
+        answers = self._prompt(
             {
                 "type": "input",
                 "name": "number",
                 "message": message,
                 "validate": validator,
-            },
-            style=self.style,
+            }
         )
 
         number = answers.get("number")
@@ -0,0 +1,278 @@
+"""
+This module contains the cross-app aggregation of the booking backends.
+
+booking.moh.gov.ge serves the same services through several applications
+("abc" and "def"). The aggregated service queries all of them concurrently
+and merges the results into a single availability view. Locations are
+de-duplicated by ID, rooms by name and slots by time; every merged item
+lists the applications it came from under the "apps" key.
+
+The methods have the call shape of BookingAPIService, with app=None meaning
+all applications, so the service can be passed to the pipeline and the
+scanner as is.
+
+This file is part of the vaccination.py.
+
+(c) 2021 Temuri Takalandze <me@abgeo.dev>
+
+For the full copyright and license information, please view the LICENSE
+file that was distributed with this source code.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Callable, Dict, Iterable, Iterator, List, Union
+
+from vaccination.service.api.base import Deadline, DeadlineExceededError
+from vaccination.service.api.booking import BookingAPIService
+from vaccination.service.pipeline import parse_slot_date
+
+
+def _merge_by_id(results: Dict[str, List[Dict[str, str]]]) -> List[Dict[str, any]]:
+    merged = {}
+    for app, items in results.items():
+        for item in items:
+            if item["id"] in merged:
+                merged[item["id"]]["apps"].append(app)
+            else:
+                merged[item["id"]] = dict(item, apps=[app])
+
+    return list(merged.values())
+
+
+def _room_days(room: Dict[str, any]) -> Iterator[Dict[str, any]]:
+    for schedule in room["schedules"]:
+        yield from schedule["dates"]
+
+
+def _merge_day(dates: Dict[str, Dict], day: Dict[str, any], app: str) -> None:
+    merged = dates.setdefault(day["dateName"], dict(day, slots={}))
+    for slot in day["slots"]:
+        if slot["value"] in merged["slots"]:
+            merged["slots"][slot["value"]]["apps"].append(app)
+        else:
+            merged["slots"][slot["value"]] = dict(slot, apps=[app])
+
+
+def _sorted_days(dates: Dict[str, Dict]) -> List[Dict[str, any]]:
+    days = [
+        dict(day, slots=sorted(day["slots"].values(), key=lambda slot: slot["value"]))
+        for day in dates.values()
+    ]
+    try:
+        days.sort(key=lambda day: parse_slot_date(day["dateName"]))
+    except ValueError:
+        pass
+
+    return days
+
+
+def _merge_rooms(results: Dict[str, List[Dict]]) -> List[Dict[str, any]]:
+    rooms = {}
+    for app, app_rooms in results.items():
+        for room in app_rooms:
+            dates = rooms.setdefault(room["name"], {})
+            for day in _room_days(room):
+                _merge_day(dates, day, app)
+
+    return [
+        {"name": name, "schedules": [{"dates": _sorted_days(dates)}]}
+        for name, dates in rooms.items()
+    ]
+
+
+class AggregatedBookingService:
+    """
+    Queries all booking applications and merges their results.
+
+    Applications that fail are skipped, a call only fails when every
+    application fails or when the deadline given by the caller expires. The
+    errors of the last call of every application are kept in "errors".
+
+    The calling thread queries one application itself and hands the others
+    to a shared pool, sized for "callers" concurrent callers, e.g. the
+    prefetcher and the search index workers.
+    """
+
+    apps = ("abc", "def")
+    callers = 16
+
+    def __init__(
+        self,
+        api_service: BookingAPIService = None,
+        apps: Iterable[str] = None,
+        callers: int = None,
+    ):
+        self.api_service = api_service or BookingAPIService()
+        self.apps = tuple(apps or self.apps)
+        self.errors: Dict[str, Exception] = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, (callers or self.callers) * (len(self.apps) - 1))
+        )
+
+    def _query(
+        self,
+        function: Callable,
+        *args,
+        app: str = None,
+        deadline: Deadline = None,
+        **kwargs,
+    ) -> Dict[str, any]:
+        def call(name: str) -> any:
+            try:
+                return function(*args, app=name, deadline=deadline, **kwargs)
+            except Exception as error:  # pylint: disable=broad-except
+                return error
+
+        apps = self.apps if app is None else (app,)
+        futures = [self._executor.submit(call, name) for name in apps[1:]]
+        outcomes = [call(apps[0])] + [future.result() for future in futures]
+
+        results = {}
+        errors = {}
+        for name, outcome in zip(apps, outcomes):
+            if isinstance(outcome, Exception):
+                errors[name] = outcome
+            else:
+                results[name] = outcome
+        self.errors.update(errors)
+        for name in results:
+            self.errors.pop(name, None)
+
+        if deadline is not None and deadline.expired():
+            # The deadline is shared, a partial answer would look complete.
+            for error in errors.values():
+                if isinstance(error, DeadlineExceededError):
+                    raise error
+        if not results:
+            raise errors[apps[0]]
+
+        return results
+
+    def get_regions(
+        self,
+        service: str,
+        only_free: bool = True,
+        app: str = None,
+        deadline: Deadline = None,
+    ) -> List[Dict[str, any]]:
+        """
+        Get regions of all applications.
+
+        :param str service: Service ID.
+        :param bool only_free: Get only free.
+        :param str app: Application, None for all applications.
+        :param Deadline deadline: Deadline of the call including retries.
+        :return: Merged regions.
+        """
+
+        return _merge_by_id(
+            self._query(
+                self.api_service.get_regions,
+                service,
+                only_free,
+                app=app,
+                deadline=deadline,
+            )
+        )
+
+    def get_municipalities(
+        self,
+        region: str,
+        service: str,
+        only_free: bool = True,
+        app: str = None,
+        deadline: Deadline = None,
+    ) -> List[Dict[str, any]]:
+        """
+        Get municipalities of all applications.
+
+        :param str region: Region ID.
+        :param str service: Service ID.
+        :param bool only_free: Get only free.
+        :param str app: Application, None for all applications.
+        :param Deadline deadline: Deadline of the call including retries.
+        :return: Merged municipalities.
+        """
+
+        return _merge_by_id(
+            self._query(
+                self.api_service.get_municipalities,
+                region,
+                service,
+                only_free,
+                app=app,
+                deadline=deadline,
+            )
+        )
+
+    def get_municipality_branches(
+        self,
+        service: str,
+        municipality: str,
+        only_free: bool = True,
+        app: str = None,
+        deadline: Deadline = None,
+    ) -> List[Dict[str, any]]:
+        """
+        Get municipality branches of all applications.
+
+        :param str service: Service ID.
+        :param str municipality: Municipality ID.
+        :param bool only_free: Get only free.
+        :param str app: Application, None for all applications.
+        :param Deadline deadline: Deadline of the call including retries.
+        :return: Merged branches.
+        """
+
+        return _merge_by_id(
+            self._query(
+                self.api_service.get_municipality_branches,
+                service,
+                municipality,
+                only_free,
+                app=app,
+                deadline=deadline,
+            )
+        )
+
+    def get_slots(
+        self,
+        branch: str,
+        region: str,
+        service: str,
+        start_date: date,
+        end_date: date,
+        app: str = None,
+        deadline: Deadline = None,
+    ) -> List[Dict[str, Union[str, List]]]:
+        """
+        Get slots of all applications.
+
+        The result has the "get_slots" shape with a single schedule per room,
+        days are ordered by date and slots by time.
+
+        :param str branch: Branch ID.
+        :param str region: Region ID.
+        :param str service: Service ID.
+        :param date start_date: Start date.
+        :param date end_date: End date.
+        :param str app: Application, None for all applications.
+        :param Deadline deadline: Deadline of the call including retries.
+        :return: Merged rooms.
+        """
+
+        location = (branch, region, service, start_date, end_date)
+
+        return _merge_rooms(
+            self._query(
+                self.api_service.get_slots, *location, app=app, deadline=deadline
+            )
+        )
+
+    def close(self) -> None:
+        """
+        Stop the worker threads.
+        """
+
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,278 @@
+"""
+This module contains the subscription matching engine for slot alerts.
+
+Subscriptions are indexed by (service, location) and by the hours of the week
+their time window covers, so matching a slot only looks at the subscriptions
+of a single index bucket instead of scanning all of them.
+
+This file is part of the vaccination.py.
+
+(c) 2021 Temuri Takalandze <me@abgeo.dev>
+
+For the full copyright and license information, please view the LICENSE
+file that was distributed with this source code.
+"""
+
+import datetime
+from collections import defaultdict, deque
+from typing import Callable, Dict, Iterable, List, Tuple
+
+import requests
+
+from vaccination.service.pipeline import parse_slot_time
+
+LOCATION_LEVELS = ("branch", "municipality", "region")
+
+
+def _to_minutes(value: str) -> int:
+    hour, minute = value.split(":")
+    return int(hour) * 60 + int(minute)
+
+
+class Subscription:  # pylint: disable=too-many-instance-attributes
+    """
+    Standing request for slots of a service at a location.
+
+    A time window that ends before it starts, e.g. 22:00-02:00, runs
+    overnight into the next day.
+    """
+
+    def __init__(
+        self,
+        subscription_id: str,
+        service: str,
+        location: str = None,
+        weekdays: Iterable[int] = range(7),
+        start_time: str = "00:00",
+        end_time: str = "24:00",
+        days: int = 14,
+        start_date: datetime.date = None,
+    ):
+        """
+        :param str subscription_id: Subscription ID.
+        :param str service: Service ID.
+        :param str location: Region, municipality or branch ID, None for any.
+        :param weekdays: Weekdays the time window starts on, Monday is 0.
+        :param str start_time: Start of the daily time window, "HH:MM".
+        :param str end_time: End of the daily time window (exclusive), "HH:MM".
+        :param int days: Number of days the subscription looks ahead.
+        :param date start_date: First accepted date, defaults to the day the
+            slot is observed.
+        """
+
+        self.subscription_id = subscription_id
+        self.service = service
+        self.location = location
+        self.weekdays = frozenset(weekdays)
+        self.start_minute = _to_minutes(start_time)
+        self.end_minute = _to_minutes(end_time)
+        self.days = days
+        self.start_date = start_date
+        if self.start_minute == self.end_minute:
+            raise ValueError(f"Empty time window: {start_time}-{end_time}")
+
+    def _ranges(self) -> List[Tuple[int, int, int]]:
+        # (day offset, first minute, end minute) of the window parts.
+        if self.start_minute < self.end_minute:
+            return [(0, self.start_minute, self.end_minute)]
+
+        return [(0, self.start_minute, 24 * 60), (1, 0, self.end_minute)]
+
+    def hours(self) -> List[int]:
+        """
+        Get the hours of the week covered by the time window.
+
+        :return: Hour indexes, 0 is Monday 00:00-01:00.
+        """
+
+        return sorted(
+            {
+                (weekday + offset) % 7 * 24 + hour
+                for weekday in self.weekdays
+                for offset, first, end in self._ranges()
+                for hour in range(first // 60, (end - 1) // 60 + 1)
+            }
+        )
+
+    def accepts(
+        self, slot_time: datetime.datetime, today: datetime.date = None
+    ) -> bool:
+        """
+        Check the slot time against the date range and the time window.
+
+        :param datetime slot_time: Slot start time.
+        :param date today: Observation day, the date range starts on it unless
+            the subscription has a fixed start date.
+        :return: Match status.
+        """
+
+        start_date = self.start_date or today or datetime.date.today()
+        if (
+            not start_date
+            <= slot_time.date()
+            < start_date + datetime.timedelta(days=self.days)
+        ):
+            return False
+
+        minute = slot_time.hour * 60 + slot_time.minute
+        for offset, first, end in self._ranges():
+            if (
+                first <= minute < end
+                and (slot_time.weekday() - offset) % 7 in self.weekdays
+            ):
+                return True
+
+        return False
+
+
+class SubscriptionIndex:
+    """
+    Index of subscriptions over (service, location, hour of week).
+    """
+
+    def __init__(self):
+        self.subscriptions: Dict[str, Subscription] = {}
+        self._buckets: Dict[Tuple[str, str, int], List[Subscription]] = defaultdict(
+            list
+        )
+
+    def __len__(self) -> int:
+        return len(self.subscriptions)
+
+    def add(self, subscription: Subscription) -> None:
+        """
+        Add subscription to the index, replacing one with the same ID.
+
+        :param Subscription subscription: Subscription to add.
+        """
+
+        self.remove(subscription.subscription_id)
+        self.subscriptions[subscription.subscription_id] = subscription
+        for hour in subscription.hours():
+            self._buckets[(subscription.service, subscription.location, hour)].append(
+                subscription
+            )
+
+    def remove(self, subscription_id: str) -> None:
+        """
+        Remove subscription from the index.
+
+        :param str subscription_id: Subscription ID.
+        """
+
+        subscription = self.subscriptions.pop(subscription_id, None)
+        if subscription is None:
+            return
+
+        for hour in subscription.hours():
+            key = (subscription.service, subscription.location, hour)
+            self._buckets[key].remove(subscription)
+            if not self._buckets[key]:
+                del self._buckets[key]
+
+    def match(
+        self, record: Dict[str, str], today: datetime.date = None
+    ) -> List[Subscription]:
+        """
+        Find subscriptions matching a slot record.
+
+        :param record: Slot record from pipeline.iter_slots().
+        :param date today: Observation day, defaults to today.
+        :return: Matching subscriptions.
+        """
+
+        slot_time = parse_slot_time(record)
+        hour = slot_time.weekday() * 24 + slot_time.hour
+        matches = []
+        for location in [record[level] for level in LOCATION_LEVELS] + [None]:
+            for subscription in self._buckets.get(
+                (record["service"], location, hour), ()
+            ):
+                if subscription.accepts(slot_time, today):
+                    matches.append(subscription)
+
+        return matches
+
+
+class AlertDispatcher:
+    """
+    Matches newly observed slots and sends alerts to the sinks.
+
+    Every alert is the slot record extended with the "subscription" ID, so the
+    pipeline sinks (e.g. pipeline.JSONLinesSink) can be used as alert sinks.
+    A slot is alerted again when it reappears after it was not observed for
+    "forget_after" seconds, e.g. because it was booked and freed later, so
+    "forget_after" should be longer than the polling interval.
+    """
+
+    def __init__(
+        self,
+        index: SubscriptionIndex,
+        sinks: Iterable[Callable[[Dict], None]],
+        forget_after: float = 300,
+    ):
+        self.index = index
+        self.sinks = list(sinks)
+        self.forget_after = forget_after
+        # Recent (alert, error) pairs of the failed sink calls.
+        self.errors = deque(maxlen=100)
+        self._seen: Dict[Tuple[str, ...], float] = {}
+
+    def observe(
+        self, records: Iterable[Dict[str, str]], now: datetime.datetime = None
+    ) -> int:
+        """
+        Process slot records, ignoring slots that were observed recently.
+
+        A failing sink does not stop the other sinks and the remaining alerts.
+
+        :param records: Slot records from pipeline.iter_slots().
+        :param datetime now: Observation time, defaults to now.
+        :return: Number of sent alerts.
+        """
+
+        now = now or datetime.datetime.now()
+        timestamp = now.timestamp()
+        self._seen = {
+            key: seen
+            for key, seen in self._seen.items()
+            if timestamp - seen < self.forget_after
+        }
+
+        sent = 0
+        for record in records:
+            key = (
+                record["app"],
+                record["branch"],
+                record["room"],
+                record["date"],
+                record["time"],
+            )
+            recent = key in self._seen
+            self._seen[key] = timestamp
+            if recent:
+                continue
+
+            for subscription in self.index.match(record, now.date()):
+                alert = dict(record, subscription=subscription.subscription_id)
+                for sink in self.sinks:
+                    try:
+                        sink(alert)
+                    except Exception as error:  # pylint: disable=broad-except
+                        self.errors.append((alert, error))
+                sent += 1
+
+        return sent
+
+
+class WebhookSink:
+    """
+    Sink that POSTs every alert as JSON to the given URL.
+    """
+
+    def __init__(self, url: str, timeout: Tuple[float, float] = (5, 30)):
+        self.url = url
+        self.timeout = timeout
+
+    def __call__(self, alert: Dict[str, str]) -> None:
+        requests.post(self.url, json=alert, timeout=self.timeout)
@@ -0,0 +1,166 @@
+"""
+This module contains vectorized availability analytics over slot data.
+
+NumPy is an optional dependency: install it with "pip install
+vaccination[analytics]".
+
+This file is part of the vaccination.py.
+
+(c) 2021 Temuri Takalandze <me@abgeo.dev>
+
+For the full copyright and license information, please view the LICENSE
+file that was distributed with this source code.
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from vaccination.service.pipeline import parse_slot_time
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError(
+            "NumPy is required for analytics: pip install vaccination[analytics]"
+        )
+
+
+class SlotArrays:
+    """
+    Columnar representation of slot records.
+
+    Slot times are stored as datetime64 values and branch, region and service
+    IDs as integer codes into the respective arrays of "names".
+    """
+
+    def __init__(self, times, branches, regions, services, names):
+        _require_numpy()
+
+        self.times = times
+        self.branches = branches
+        self.regions = regions
+        self.services = services
+        self.names = names
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, str]]) -> "SlotArrays":
+        """
+        Build arrays from slot records, e.g. from pipeline.iter_slots().
+
+        :param records: Slot records.
+        :return: SlotArrays instance.
+        """
+
+        _require_numpy()
+
+        labels = {}
+        times, branches, regions, services = [], [], [], []
+        for record in records:
+            times.append(parse_slot_time(record))
+            branches.append(record["branch"])
+            labels.setdefault(record["branch"], record.get("branch_name"))
+            regions.append(record["region"])
+            services.append(record["service"])
+
+        names = {}
+        codes = {}
+        for key, values in (
+            ("branch", branches),
+            ("region", regions),
+            ("service", services),
+        ):
+            names[key], codes[key] = np.unique(
+                np.array(values, dtype=str), return_inverse=True
+            )
+        names["branch_name"] = np.array(
+            [labels[branch] or branch for branch in names["branch"]], dtype=str
+        )
+
+        return cls(
+            np.array(times, dtype="datetime64[m]"),
+            codes["branch"],
+            codes["region"],
+            codes["service"],
+            names,
+        )
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def free_slots_per_day(self) -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        Count free slots per day per region.
+
+        :return: Days and a (region, day) matrix of counts.
+        """
+
+        days, day_codes = np.unique(
+            self.times.astype("datetime64[D]"), return_inverse=True
+        )
+        counts = np.zeros((len(self.names["region"]), len(days)), dtype=np.int64)
+        np.add.at(counts, (self.regions, day_codes), 1)
+
+        return days, counts
+
+    def hour_heatmap(self) -> "np.ndarray":
+        """
+        Count free slots per weekday and hour of day.
+
+        :return: (weekday, hour) matrix of counts, Monday is weekday 0.
+        """
+
+        days = self.times.astype("datetime64[D]")
+        # 1970-01-01 was a Thursday.
+        weekdays = (days.astype(np.int64) + 3) % 7
+        hours = (self.times - days).astype("timedelta64[h]").astype(np.int64)
+        heatmap = np.zeros((7, 24), dtype=np.int64)
+        np.add.at(heatmap, (weekdays, hours), 1)
+
+        return heatmap
+
+    def first_available(self, now: datetime = None) -> "np.ndarray":
+        """
+        Get the time to the first available slot of every branch.
+
+        :param datetime now: Reference time, defaults to the current time.
+        :return: Minutes to the first slot, indexed by branch code.
+        """
+
+        reference = np.datetime64(now or datetime.now(), "m")
+        order = np.argsort(self.times, kind="stable")
+        # Every branch code occurs at least once, so the first occurrences
+        # in time order are indexed by branch code.
+        _, index = np.unique(self.branches[order], return_index=True)
+
+        return (self.times[order][index] - reference).astype(np.int64)
+
+    def first_available_histogram(
+        self, bins: int = 10, now: datetime = None
+    ) -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        Get the distribution of the time to the first available slot.
+
+        :param int bins: Number of histogram bins.
+        :param datetime now: Reference time, defaults to the current time.
+        :return: Branch counts and bin edges in hours.
+        """
+
+        return np.histogram(self.first_available(now) / 60, bins=bins)
+
+    def branch_ranking(self, top: int = None) -> List[Tuple[str, int]]:
+        """
+        Rank branches by the number of free slots.
+
+        :param int top: Number of branches to return, all by default.
+        :return: Branch names with their slot counts, best first.
+        """
+
+        counts = np.bincount(self.branches, minlength=len(self.names["branch"]))
+        order = np.argsort(-counts, kind="stable")[:top]
+
+        return [(str(self.names["branch_name"][i]), int(counts[i])) for i in order]
@@ -9,11 +9,93 @@ For the full copyright and license information, please view the LICENSE
 file that was distributed with this source code.
 """
 
-
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
 from string import Template
+from typing import Callable, Dict, Tuple
+
+from vaccination.core.profiler import profiler
+from vaccination.service.api.transport import (
+    RequestsTransport,
+    Transport,
+    TransportResponse,
+    TransportTimeoutError,
+)
+
+
+class DeadlineExceededError(TimeoutError):
+    """
+    Raised when a deadline expires before the operation is completed.
+    """
+
+
+class Deadline:
+    """
+    Point in time after which an operation must give up.
+
+    Wall-clock time is used, so a deadline can be shared between processes.
+    """
+
+    def __init__(self, seconds: float):
+        self.expires_at = time.time() + seconds
+
+    @classmethod
+    def at(cls, timestamp: float) -> "Deadline":
+        """
+        Create deadline that expires at the given UNIX timestamp.
+
+        :param float timestamp: Expiration time.
+        :return: Deadline instance.
+        """
+
+        deadline = cls(0)
+        deadline.expires_at = timestamp
 
-import requests
-from requests.models import Response
+        return deadline
+
+    def remaining(self) -> float:
+        """
+        Get the number of seconds left.
+
+        :return: Remaining time, never negative.
+        """
+
+        return max(0.0, self.expires_at - time.time())
+
+    def expired(self) -> bool:
+        """
+        Check whether the deadline has passed.
+
+        :return: Expiration status.
+        """
+
+        return time.time() >= self.expires_at
+
+    def check(self) -> None:
+        """
+        Raise DeadlineExceededError if the deadline has passed.
+        """
+
+        if self.expired():
+            raise DeadlineExceededError("Deadline exceeded")
+
+    def limit(self, timeout: Tuple[float, float]) -> Tuple[float, float]:
+        """
+        Shorten connect and read timeouts to the remaining time.
+
+        :param timeout: Connect and read timeouts.
+        :return: Limited timeouts.
+        :raises DeadlineExceededError: If no time is left.
+        """
+
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceededError("Deadline exceeded")
+
+        return min(timeout[0], remaining), min(timeout[1], remaining)
 
 
 def retry_request(times):
@@ -45,18 +127,128 @@ def retry_request(times):
 class BaseAPIService:
     """
     Base service for working with the APIs.
+
+    Responses are remembered per request. GET requests are sent with the
+    ETag/Last-Modified validators of the previous response, and bodies are
+    fingerprinted, so an unchanged payload is neither decoded again nor
+    copied: the previously returned object is returned as is. Callers can
+    detect unchanged data with an identity check and must not modify it.
+    Crawlers that must not hold on to payloads run with a
+    "response_cache_size" of 0, which turns the cache off.
+
+    Every instance has its own HTTP transport, so connections are never
+    shared with forked worker processes. The bytes received on the wire and
+    after decoding are accounted per API path in "transfer_stats".
     """
 
     url_template = None
+    # Creates the HTTP transport of every instance, see the transport module.
+    transport_class: Callable[[], Transport] = RequestsTransport
+    # Connect and read timeouts of a single HTTP request, in seconds.
+    timeout = (5, 30)
+    # Default time budget of an API call including all retries, in seconds.
+    request_deadline = 60
+    # Number of remembered responses, 0 disables the response cache.
+    response_cache_size = 1024
+
+    def __init__(self, transport: Transport = None, response_cache_size: int = None):
+        self.transport = transport or self.transport_class()
+        if response_cache_size is not None:
+            self.response_cache_size = response_cache_size
+        self.transfer_stats: Dict[str, Dict[str, int]] = {}
+        self._responses = OrderedDict()
+        self._responses_lock = threading.Lock()
+
+    def close(self) -> None:
+        """
+        Close the connections of the transport.
+        """
+
+        self.transport.close()
+
+    def _account(self, path: str, response: TransportResponse) -> None:
+        with self._responses_lock:
+            stats = self.transfer_stats.setdefault(
+                path, {"requests": 0, "wire_bytes": 0, "decoded_bytes": 0}
+            )
+            stats["requests"] += 1
+            stats["wire_bytes"] += response.wire_bytes
+            stats["decoded_bytes"] += response.decoded_bytes
 
     @retry_request(times=20)
-    def _make_request(self, method: str, **kwargs) -> Response:
+    def _make_request(self, method: str, **kwargs) -> TransportResponse:
+        path = kwargs.get("url", {}).get("path")
         url = Template(self.url_template).substitute(**kwargs.get("url", {}))
         del kwargs["url"]
-        return requests.request(method, url, **kwargs)
-
-    def _get(self, **kwargs):
-        return self._make_request("get", **kwargs).json()
 
-    def _post(self, **kwargs):
-        return self._make_request("post", **kwargs).json()
+        deadline = kwargs.pop("deadline", None)
+        timeout = kwargs.pop("timeout", self.timeout)
+        if deadline is not None:
+            deadline.check()
+            timeout = deadline.limit(timeout)
+
+        try:
+            response = self.transport.request(method, url, timeout=timeout, **kwargs)
+        except TransportTimeoutError as error:
+            if deadline is not None and deadline.expired():
+                raise DeadlineExceededError("Deadline exceeded") from error
+            raise
+
+        self._account(path, response)
+
+        return response
+
+    def _request_json(self, method: str, deadline: Deadline = None, **kwargs):
+        deadline = deadline or Deadline(self.request_deadline)
+        key = cached = None
+        if self.response_cache_size > 0:
+            key = json.dumps([method, kwargs], sort_keys=True, default=str)
+            with self._responses_lock:
+                cached = self._responses.get(key)
+        if cached is not None and method == "get":
+            kwargs["headers"] = dict(kwargs.get("headers", {}), **cached["validators"])
+
+        with profiler.measure("api", kwargs["url"].get("path")) as details:
+            response = self._make_request(method, deadline=deadline, **kwargs)
+            details["wire_bytes"] = response.wire_bytes
+            details["decoded_bytes"] = response.decoded_bytes
+
+        if key is None:
+            return response.json()
+
+        if cached is not None and response.status_code == 304:
+            return self._remember(key, cached)
+
+        fingerprint = hashlib.blake2b(response.content, digest_size=16).digest()
+        if cached is not None and cached["fingerprint"] == fingerprint:
+            return self._remember(key, cached)
+
+        validators = {}
+        if "ETag" in response.headers:
+            validators["If-None-Match"] = response.headers["ETag"]
+        if "Last-Modified" in response.headers:
+            validators["If-Modified-Since"] = response.headers["Last-Modified"]
+
+        return self._remember(
+            key,
+            {
+                "fingerprint": fingerprint,
+                "validators": validators,
+                "data": response.json(),
+            },
+        )
+
+    def _remember(self, key: str, entry: dict):
+        with self._responses_lock:
+            self._responses[key] = entry
+            self._responses.move_to_end(key)
+            while len(self._responses) > self.response_cache_size:
+                self._responses.popitem(last=False)
+
+        return entry["data"]
+
+    def _get(self, deadline: Deadline = None, **kwargs):
+        return self._request_json("get", deadline, **kwargs)
+
+    def _post(self, deadline: Deadline = None, **kwargs):
+        return self._request_json("post", deadline, **kwargs)
@@ -10,13 +10,14 @@ file that was distributed with this source code.
 """
 
 import json
+import threading
 from datetime import date
 from typing import Dict, Union, List
 
 import requests
-from requests.models import Response
 
-from vaccination.service.api.base import BaseAPIService
+from vaccination.service.api.base import BaseAPIService, Deadline
+from vaccination.service.api.transport import Transport, TransportResponse
 
 
 class BookingAPIService(BaseAPIService):
@@ -25,19 +26,29 @@ class BookingAPIService(BaseAPIService):
     """
 
     url_template = "https://booking.moh.gov.ge/$app/API/api$path"
-    security_numbers = []
-
-    def _make_request(self, method: str, **kwargs) -> Response:
-        kwargs["headers"] = {"SecurityNumber": self.__get_security_number()}
+    security_numbers_url = "https://vaccination.abgeo.dev/api/numbers?count=10"
+
+    def __init__(self, transport: Transport = None, response_cache_size: int = None):
+        super().__init__(transport, response_cache_size)
+        # Numbers are fetched per instance, so concurrent users of separate
+        # instances never wait for each other's refill.
+        self.security_numbers = []
+        self.security_numbers_lock = threading.Lock()
+
+    def _make_request(self, method: str, **kwargs) -> TransportResponse:
+        kwargs["headers"] = dict(
+            kwargs.get("headers", {}), SecurityNumber=self.__get_security_number()
+        )
         return super()._make_request(method, **kwargs)
 
     def __get_security_number(self) -> str:
-        if not self.security_numbers:
-            self.security_numbers = requests.get(
-                "https://vaccination.abgeo.dev/api/numbers?count=10"
-            ).json()
+        with self.security_numbers_lock:
+            if not self.security_numbers:
+                self.security_numbers = requests.get(
+                    self.security_numbers_url, timeout=self.timeout
+                ).json()
 
-        return self.security_numbers.pop(0)
+            return self.security_numbers.pop(0)
 
     def get_available_quantities(self, app: str = "def") -> Dict[str, int]:
         """
@@ -68,7 +79,11 @@ class BookingAPIService(BaseAPIService):
         return self._get(url={"app": app, "path": "/CommonData/GetServicesTypes"})
 
     def get_regions(
-        self, service: str, only_free: bool = True, app: str = "def"
+        self,
+        service: str,
+        only_free: bool = True,
+        app: str = "def",
+        deadline: Deadline = None,
     ) -> List[Dict[str, str]]:
         """
         Make GET request to the "/CommonData/GetRegions" endpoint.
@@ -76,16 +91,23 @@ class BookingAPIService(BaseAPIService):
         :param str service: Service ID.
         :param bool only_free: Get only free.
         :param app: Application.
+        :param Deadline deadline: Deadline of the call including retries.
         :return: Endpoint response.
         """
 
         return self._get(
             url={"app": app, "path": "/CommonData/GetRegions"},
             data={"serviceId": service, "onlyFree": only_free},
+            deadline=deadline,
         )
 
     def get_municipalities(
-        self, region: str, service: str, only_free: bool = True, app: str = "def"
+        self,
+        region: str,
+        service: str,
+        only_free: bool = True,
+        app: str = "def",
+        deadline: Deadline = None,
     ) -> List[Dict[str, str]]:
         """
         Make GET request to the "/CommonData/GetMunicipalities/{region}" endpoint.
@@ -94,16 +116,23 @@ class BookingAPIService(BaseAPIService):
         :param str service: Service ID.
         :param bool only_free: Get only free.
         :param app: Application.
+        :param Deadline deadline: Deadline of the call including retries.
         :return: Endpoint response.
         """
 
         return self._get(
             url={"app": app, "path": f"/CommonData/GetMunicipalities/{region}"},
             data={"serviceId": service, "onlyFree": only_free},
+            deadline=deadline,
         )
 
     def get_municipality_branches(
-        self, service: str, municipality: str, only_free: bool = True, app: str = "def"
+        self,
+        service: str,
+        municipality: str,
+        only_free: bool = True,
+        app: str = "def",
+        deadline: Deadline = None,
     ) -> List[Dict[str, str]]:
         """
         Make GET request to the
@@ -113,6 +142,7 @@ class BookingAPIService(BaseAPIService):
         :param str municipality: Municipality ID.
         :param bool only_free: Get only free.
         :param str app: Application.
+        :param Deadline deadline: Deadline of the call including retries.
         :return: Endpoint response.
         """
 
@@ -122,6 +152,7 @@ class BookingAPIService(BaseAPIService):
                 "path": f"/CommonData/GetMunicipalityBranches/{service}/{municipality}",
             },
             data={"onlyFree": only_free},
+            deadline=deadline,
         )
 
     def get_slots(
@@ -132,6 +163,7 @@ class BookingAPIService(BaseAPIService):
         start_date: date,
         end_date: date,
         app: str = "def",
+        deadline: Deadline = None,
     ) -> List[Dict[str, Union[str, List]]]:
         """
         Make POST request to the "/PublicBooking/GetSlots" endpoint.
@@ -142,6 +174,7 @@ class BookingAPIService(BaseAPIService):
         :param date start_date: Start date.
         :param date end_date: End date.
         :param str app: Application.
+        :param Deadline deadline: Deadline of the call including retries.
         :return: Endpoint response.
         """
 
@@ -154,6 +187,7 @@ class BookingAPIService(BaseAPIService):
                 "regionID": region,
                 "serviceID": service,
             },
+            deadline=deadline,
         )
 
     def search_booking(
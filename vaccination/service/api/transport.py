@@ -0,0 +1,206 @@
+"""
+HTTP transports for the API services.
+
+A transport sends a request and returns a TransportResponse with the
+decoded body and the number of bytes received on the wire, so compression
+savings can be accounted per request and in total.
+
+This file is part of the vaccination.py.
+
+(c) 2021 Temuri Takalandze <me@abgeo.dev>
+
+For the full copyright and license information, please view the LICENSE
+file that was distributed with this source code.
+"""
+
+import json
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Mapping, Tuple
+
+import requests
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+
+class TransportTimeoutError(TimeoutError):
+    """
+    Raised when a transport gives up waiting for the server.
+    """
+
+
+class TransportResponse:
+    """
+    Transport-independent HTTP response.
+    """
+
+    def __init__(
+        self,
+        status_code: int,
+        headers: Mapping[str, str],
+        content: bytes,
+        wire_bytes: int,
+    ):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.wire_bytes = wire_bytes
+
+    @property
+    def decoded_bytes(self) -> int:
+        """
+        Size of the decoded (decompressed) body.
+
+        :return: Number of bytes.
+        """
+
+        return len(self.content)
+
+    def json(self) -> any:
+        """
+        Decode JSON body.
+
+        :return: Decoded body.
+        """
+
+        return json.loads(self.content)
+
+
+class Transport(ABC):
+    """
+    Base transport, keeps the totals of all requests.
+    """
+
+    def __init__(self):
+        self.stats = {"requests": 0, "wire_bytes": 0, "decoded_bytes": 0}
+        self._stats_lock = threading.Lock()
+
+    def request(
+        self, method: str, url: str, timeout: Tuple[float, float], **kwargs
+    ) -> TransportResponse:
+        """
+        Send HTTP request.
+
+        :param str method: HTTP method.
+        :param str url: URL.
+        :param timeout: Connect and read timeouts in seconds.
+        :param kwargs: "headers", "data" and "json" as in requests.
+        :return: Response.
+        """
+
+        response = self._send(method, url, timeout, **kwargs)
+        with self._stats_lock:
+            self.stats["requests"] += 1
+            self.stats["wire_bytes"] += response.wire_bytes
+            self.stats["decoded_bytes"] += response.decoded_bytes
+
+        return response
+
+    @abstractmethod
+    def _send(
+        self, method: str, url: str, timeout: Tuple[float, float], **kwargs
+    ) -> TransportResponse:
+        pass
+
+    def close(self) -> None:
+        """
+        Close open connections.
+        """
+
+
+class RequestsTransport(Transport):
+    """
+    HTTP/1.1 transport based on a pooled requests session.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.session = requests.Session()
+
+    def _send(
+        self, method: str, url: str, timeout: Tuple[float, float], **kwargs
+    ) -> TransportResponse:
+        try:
+            response = self.session.request(method, url, timeout=timeout, **kwargs)
+        except requests.Timeout as error:
+            raise TransportTimeoutError(str(error)) from error
+
+        # urllib3 counts the raw (still compressed) bytes it has read.
+        wire_bytes = response.raw.tell() if response.raw else len(response.content)
+
+        return TransportResponse(
+            response.status_code, response.headers, response.content, wire_bytes
+        )
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class HTTPXTransport(Transport):
+    """
+    Transport based on httpx with HTTP/2 enabled.
+
+    Concurrent requests to the same host are multiplexed over a single
+    connection when the server supports HTTP/2, and gzip/brotli responses
+    are negotiated. Requires "pip install vaccination[http2]".
+
+    HTTP/2 is negotiated with TLS; disable HTTP/1.1 to talk HTTP/2 to a
+    plain-text server that supports it ("prior knowledge").
+    """
+
+    def __init__(
+        self, http2: bool = True, max_connections: int = 10, http1: bool = True
+    ):
+        if httpx is None:
+            raise ImportError("httpx is required: pip install vaccination[http2]")
+
+        super().__init__()
+        self.client = httpx.Client(
+            http1=http1,
+            http2=http2,
+            limits=httpx.Limits(max_connections=max_connections),
+        )
+
+    def _send(
+        self, method: str, url: str, timeout: Tuple[float, float], **kwargs
+    ) -> TransportResponse:
+        try:
+            response = self.client.request(
+                method,
+                url,
+                timeout=httpx.Timeout(timeout[1], connect=timeout[0]),
+                **kwargs,
+            )
+        except httpx.TimeoutException as error:
+            raise TransportTimeoutError(str(error)) from error
+
+        return TransportResponse(
+            response.status_code,
+            response.headers,
+            response.content,
+            response.num_bytes_downloaded,
+        )
+
+    def close(self) -> None:
+        self.client.close()
+
+
+def summarize(stats: Dict[str, int]) -> str:
+    """
+    Format transport totals.
+
+    :param stats: Transport.stats.
+    :return: Human-readable summary.
+    """
+
+    ratio = (
+        stats["wire_bytes"] / stats["decoded_bytes"] if stats["decoded_bytes"] else 0
+    )
+
+    return (
+        f"{stats['requests']} requests, {stats['wire_bytes']:,} bytes on the wire, "
+        f"{stats['decoded_bytes']:,} bytes decoded ({ratio:.0%})"
+    )
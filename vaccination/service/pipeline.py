@@ -0,0 +1,199 @@
+"""
+This module contains the streaming pipeline for crawl results.
+
+Every stage is a generator, so data is pulled through the pipeline one record
+at a time: the next "get_slots" call is only made when the downstream stages
+ask for more records, and a full crawl is never held in memory. API services
+remember their responses by default, so crawls pass a service created with
+"response_cache_size=0".
+
+This file is part of the vaccination.py.
+
+(c) 2021 Temuri Takalandze <me@abgeo.dev>
+
+For the full copyright and license information, please view the LICENSE
+file that was distributed with this source code.
+"""
+
+import json
+import sys
+from datetime import date, datetime, time
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, TextIO
+
+from vaccination.service.api.base import Deadline
+from vaccination.service.api.booking import BookingAPIService
+
+DATE_FORMATS = ("%Y-%m-%d", "%Y-%m-%dT%H:%M:%S", "%d.%m.%Y", "%d/%m/%Y")
+
+
+@lru_cache(maxsize=1024)
+def parse_slot_date(value: str) -> date:
+    """
+    Parse the "dateName" of a slot date.
+
+    :param str value: Date as returned by the API.
+    :return: Parsed date.
+    """
+
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+
+    raise ValueError(f"Unsupported date format: {value}")
+
+
+def parse_slot_time(record: Dict[str, str]) -> datetime:
+    """
+    Get the start time of a slot record.
+
+    :param record: Slot record from iter_slots().
+    :return: Slot start time.
+    """
+
+    hour, minute = record["time"][:5].split(":")
+
+    return datetime.combine(
+        parse_slot_date(record["date"]), time(int(hour), int(minute))
+    )
+
+
+def iter_locations(
+    api_service: BookingAPIService,
+    service: str,
+    app: str = "def",
+    deadline: Deadline = None,
+) -> Iterator[Dict[str, str]]:
+    """
+    Yield every branch of the location hierarchy.
+
+    :param BookingAPIService api_service: API service to use.
+    :param str service: Service ID.
+    :param str app: Application, None for all applications when api_service
+        is an AggregatedBookingService.
+    :param Deadline deadline: Deadline of the walk.
+    :return: Location records.
+    """
+
+    for region in api_service.get_regions(service, app=app, deadline=deadline):
+        for municipality in api_service.get_municipalities(
+            region["id"], service, app=app, deadline=deadline
+        ):
+            for branch in api_service.get_municipality_branches(
+                service, municipality["id"], app=app, deadline=deadline
+            ):
+                yield {
+                    "app": app,
+                    "service": service,
+                    "region": region["id"],
+                    "municipality": municipality["id"],
+                    "branch": branch["id"],
+                    "branch_name": branch["name"],
+                }
+
+
+def iter_slots(
+    api_service: BookingAPIService,
+    locations: Iterable[Dict[str, str]],
+    start_date: date,
+    end_date: date,
+    deadline: Deadline = None,
+) -> Iterator[Dict[str, str]]:
+    """
+    Yield one record per free slot of the given locations.
+
+    Slots of locations without an application come from an
+    AggregatedBookingService; their "app" lists the source applications,
+    e.g. "abc,def".
+
+    :param BookingAPIService api_service: API service to use, without the
+        response cache to keep the memory use bounded.
+    :param locations: Location records, e.g. from iter_locations().
+    :param date start_date: Start date.
+    :param date end_date: End date.
+    :param Deadline deadline: Deadline of every "get_slots" call.
+    :return: Slot records.
+    """
+
+    for location in locations:
+        for room in api_service.get_slots(
+            location["branch"],
+            location["region"],
+            location["service"],
+            start_date,
+            end_date,
+            location["app"],
+            deadline,
+        ):
+            for schedule in room["schedules"]:
+                for day in schedule["dates"]:
+                    for slot in day["slots"]:
+                        yield dict(
+                            location,
+                            app=location["app"] or ",".join(slot["apps"]),
+                            room=room["name"],
+                            date=day["dateName"],
+                            week_day=day["weekName"],
+                            time=slot["value"],
+                        )
+
+
+class Pipeline:
+    """
+    Lazy chain of filter and transform stages ending in a sink.
+    """
+
+    def __init__(self, source: Iterable[any]):
+        self.source = source
+
+    def filter(self, predicate: Callable[[any], bool]) -> "Pipeline":
+        """
+        Add a stage that drops records not matching the predicate.
+
+        :param predicate: Record predicate.
+        :return: New pipeline.
+        """
+
+        return Pipeline(record for record in self.source if predicate(record))
+
+    def map(self, transform: Callable[[any], any]) -> "Pipeline":
+        """
+        Add a stage that transforms every record.
+
+        :param transform: Record transformation.
+        :return: New pipeline.
+        """
+
+        return Pipeline(transform(record) for record in self.source)
+
+    def __iter__(self) -> Iterator[any]:
+        return iter(self.source)
+
+    def run(self, sink: Callable[[any], None]) -> int:
+        """
+        Pull all records through the pipeline into the sink.
+
+        :param sink: Callable receiving every record.
+        :return: Number of records.
+        """
+
+        count = 0
+        for record in self.source:
+            sink(record)
+            count += 1
+
+        return count
+
+
+class JSONLinesSink:
+    """
+    Sink that writes every record as a JSON line.
+    """
+
+    def __init__(self, stream: TextIO = sys.stdout):
+        self.stream = stream
+
+    def __call__(self, record: any) -> None:
+        self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
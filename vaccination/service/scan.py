@@ -0,0 +1,430 @@
+"""
+This module contains the sharded slot scanner.
+
+Branch-level "get_slots" calls are stored as work items in a SQLite lease
+table, so any number of worker processes - on this host or on any other host
+that can open the same database file - can process them in parallel.
+
+By default all booking applications are scanned in a single pass through
+the AggregatedBookingService.
+
+Scan services run without the response cache, so a worker never holds on to
+the slots of the branches it has already processed.
+
+A scan can be bounded by a deadline. When it expires, the results collected
+so far are returned and every branch is marked as complete or incomplete.
+
+This file is part of the vaccination.py.
+
+(c) 2021 Temuri Takalandze <me@abgeo.dev>
+
+For the full copyright and license information, please view the LICENSE
+file that was distributed with this source code.
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import time
+from datetime import date
+from multiprocessing import Process
+from typing import Dict, Iterable, List, Tuple, Union
+
+from vaccination.service.aggregate import AggregatedBookingService
+from vaccination.service.api.base import Deadline, DeadlineExceededError
+from vaccination.service.api.booking import BookingAPIService
+from vaccination.service.pipeline import iter_locations
+
+# Leases outlive the time budget of a "get_slots" call including retries, so
+# a healthy worker never loses its item.
+LEASE_TIMEOUT = 2 * BookingAPIService.request_deadline
+
+
+def _crawler() -> AggregatedBookingService:
+    return AggregatedBookingService(BookingAPIService(response_cache_size=0))
+
+
+class WorkQueue:
+    """
+    SQLite-backed work queue with leases.
+
+    A leased item that is not completed before its lease expires is handed
+    out again, so crashed workers do not lose work. Failed items are retried
+    until they reach the attempt limit.
+    """
+
+    def __init__(
+        self, path: str, lease_timeout: float = LEASE_TIMEOUT, max_attempts: int = 3
+    ):
+        self.path = path
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.connection = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS items ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "payload TEXT NOT NULL, "
+            "status TEXT NOT NULL DEFAULT 'pending', "
+            "attempts INTEGER NOT NULL DEFAULT 0, "
+            "leased_until REAL, "
+            "worker TEXT, "
+            "result TEXT, "
+            "error TEXT)"
+        )
+
+    def close(self) -> None:
+        """
+        Close the database connection.
+        """
+
+        self.connection.close()
+
+    def clear(self) -> None:
+        """
+        Remove all work items, e.g. before reusing the database for a new scan.
+        """
+
+        with self.connection:
+            self.connection.execute("DELETE FROM items")
+
+    def put(self, payloads: Iterable[Dict[str, any]]) -> None:
+        """
+        Add work items to the queue.
+
+        :param payloads: JSON-serializable work item payloads.
+        """
+
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO items (payload) VALUES (?)",
+                [(json.dumps(payload),) for payload in payloads],
+            )
+
+    def lease(self, worker: str) -> Union[Tuple[int, Dict[str, any]], None]:
+        """
+        Lease the next available work item.
+
+        :param str worker: Worker identifier.
+        :return: Item ID and payload or None if nothing is available.
+        """
+
+        now = time.time()
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            self.connection.execute(
+                "UPDATE items SET status = 'failed', error = 'lease expired' "
+                "WHERE status = 'leased' AND leased_until < ? AND attempts >= ?",
+                (now, self.max_attempts),
+            )
+            row = self.connection.execute(
+                "SELECT id, payload FROM items "
+                "WHERE status = 'pending' OR (status = 'leased' AND leased_until < ?) "
+                "ORDER BY id LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is not None:
+                self.connection.execute(
+                    "UPDATE items SET status = 'leased', attempts = attempts + 1, "
+                    "leased_until = ?, worker = ? WHERE id = ?",
+                    (now + self.lease_timeout, worker, row[0]),
+                )
+            self.connection.execute("COMMIT")
+        except sqlite3.Error:
+            self.connection.execute("ROLLBACK")
+            raise
+
+        return (row[0], json.loads(row[1])) if row is not None else None
+
+    def complete(self, item_id: int, worker: str, result: any) -> bool:
+        """
+        Mark work item as done and store its result.
+
+        Only the worker holding the lease can complete the item.
+
+        :param int item_id: Item ID.
+        :param str worker: Worker identifier.
+        :param result: JSON-serializable result.
+        :return: False if the lease was lost to another worker.
+        """
+
+        with self.connection:
+            return (
+                self.connection.execute(
+                    "UPDATE items SET status = 'done', result = ?, leased_until = NULL "
+                    "WHERE id = ? AND status = 'leased' AND worker = ?",
+                    (json.dumps(result), item_id, worker),
+                ).rowcount
+                > 0
+            )
+
+    def fail(self, item_id: int, worker: str, error: str) -> bool:
+        """
+        Release work item after a failure.
+
+        The item goes back to the queue unless it reached the attempt limit.
+        Only the worker holding the lease can fail the item.
+
+        :param int item_id: Item ID.
+        :param str worker: Worker identifier.
+        :param str error: Error description.
+        :return: False if the lease was lost to another worker.
+        """
+
+        with self.connection:
+            return (
+                self.connection.execute(
+                    "UPDATE items SET leased_until = NULL, error = ?, "
+                    "status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END "
+                    "WHERE id = ? AND status = 'leased' AND worker = ?",
+                    (error, self.max_attempts, item_id, worker),
+                ).rowcount
+                > 0
+            )
+
+    def release(self, item_id: int, worker: str) -> bool:
+        """
+        Put a leased work item back without counting the attempt.
+
+        Used when the worker stops before the item could be processed.
+
+        :param int item_id: Item ID.
+        :param str worker: Worker identifier.
+        :return: False if the lease was lost to another worker.
+        """
+
+        with self.connection:
+            return (
+                self.connection.execute(
+                    "UPDATE items SET status = 'pending', leased_until = NULL, "
+                    "attempts = attempts - 1 "
+                    "WHERE id = ? AND status = 'leased' AND worker = ?",
+                    (item_id, worker),
+                ).rowcount
+                > 0
+            )
+
+    def unfinished(self) -> int:
+        """
+        Count work items that are pending or leased.
+
+        :return: Number of unfinished items.
+        """
+
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM items WHERE status IN ('pending', 'leased')"
+        ).fetchone()[0]
+
+    def items(self) -> List[Dict[str, any]]:
+        """
+        Get all work items with their state.
+
+        :return: Work items in insertion order.
+        """
+
+        rows = self.connection.execute(
+            "SELECT payload, status, attempts, result, error FROM items ORDER BY id"
+        ).fetchall()
+
+        return [
+            {
+                "payload": json.loads(payload),
+                "status": status,
+                "attempts": attempts,
+                "result": json.loads(result) if result is not None else None,
+                "error": error,
+            }
+            for payload, status, attempts, result, error in rows
+        ]
+
+
+def enqueue_branches(
+    queue: WorkQueue,
+    service: str,
+    start_date: date,
+    end_date: date,
+    app: str = None,
+    api_service: AggregatedBookingService = None,
+    deadline: Deadline = None,
+) -> Tuple[int, bool]:
+    """
+    Walk the location hierarchy and enqueue one work item per branch.
+
+    :param WorkQueue queue: Target queue.
+    :param str service: Service ID.
+    :param date start_date: Start date.
+    :param date end_date: End date.
+    :param str app: Application, None for all applications.
+    :param AggregatedBookingService api_service: API service to use.
+    :param Deadline deadline: Deadline of the walk.
+    :return: Number of enqueued items and whether the walk was completed.
+    """
+
+    aggregator = api_service or _crawler()
+    payloads = []
+    try:
+        for location in iter_locations(aggregator, service, app, deadline):
+            payloads.append(
+                dict(
+                    location,
+                    start_date=start_date.isoformat(),
+                    end_date=end_date.isoformat(),
+                )
+            )
+        complete = True
+    except DeadlineExceededError:
+        complete = False
+    finally:
+        if api_service is None:
+            aggregator.close()
+
+    queue.put(payloads)
+
+    return len(payloads), complete
+
+
+def run_worker(
+    path: str,
+    worker: str = None,
+    lease_timeout: float = LEASE_TIMEOUT,
+    max_attempts: int = 3,
+    deadline_at: float = None,
+) -> int:
+    """
+    Process work items until the queue has nothing left to lease.
+
+    Run this on other hosts against the same database file to scale the scan
+    beyond a single machine.
+
+    :param str path: Queue database path.
+    :param str worker: Worker identifier.
+    :param float lease_timeout: Lease duration in seconds.
+    :param int max_attempts: Attempts per item before it is marked as failed.
+    :param float deadline_at: UNIX timestamp after which the worker stops.
+    :return: Number of processed items.
+    """
+
+    deadline = Deadline.at(deadline_at) if deadline_at is not None else None
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+    queue = WorkQueue(path, lease_timeout, max_attempts)
+    api_service = _crawler()
+    processed = 0
+    try:
+        while deadline is None or not deadline.expired():
+            item = queue.lease(worker)
+            if item is None:
+                if not queue.unfinished():
+                    break
+                time.sleep(1)
+                continue
+
+            item_id, payload = item
+            try:
+                rooms = api_service.get_slots(
+                    payload["branch"],
+                    payload["region"],
+                    payload["service"],
+                    date.fromisoformat(payload["start_date"]),
+                    date.fromisoformat(payload["end_date"]),
+                    payload["app"],
+                    deadline,
+                )
+            except Exception as error:  # pylint: disable=broad-except
+                if deadline is not None and deadline.expired():
+                    # The scan ran out of time, the item itself did not fail.
+                    queue.release(item_id, worker)
+                    break
+                queue.fail(item_id, worker, repr(error))
+                continue
+
+            if queue.complete(item_id, worker, rooms):
+                processed += 1
+    finally:
+        api_service.close()
+        queue.close()
+
+    return processed
+
+
+def merge_results(items: List[Dict[str, any]]) -> Dict[str, Dict[str, any]]:
+    """
+    Merge work item results into a single view keyed by branch ID.
+
+    :param items: Work items returned by WorkQueue.items().
+    :return: Branch ID to branch data mapping.
+    """
+
+    branches = {}
+    for item in items:
+        payload = item["payload"]
+        branch = branches.setdefault(
+            payload["branch"],
+            {
+                "name": payload["branch_name"],
+                "region": payload["region"],
+                "municipality": payload["municipality"],
+                "rooms": [],
+                "complete": True,
+            },
+        )
+        if item["status"] == "done":
+            branch["rooms"].extend(item["result"])
+        else:
+            branch["complete"] = False
+
+    return branches
+
+
+def scan(
+    path: str,
+    service: str,
+    start_date: date,
+    end_date: date,
+    app: str = None,
+    workers: int = None,
+    timeout: float = None,
+) -> Dict[str, any]:
+    """
+    Scan slots of all branches using a pool of local worker processes.
+
+    Items of a previous scan stored in the same database are removed first.
+
+    :param str path: Queue database path.
+    :param str service: Service ID.
+    :param date start_date: Start date.
+    :param date end_date: End date.
+    :param str app: Application, None for all applications.
+    :param int workers: Number of worker processes, defaults to the CPU count.
+    :param float timeout: Time budget of the whole scan in seconds.
+    :return: Overall completeness and merged results keyed by branch ID.
+    """
+
+    deadline = Deadline(timeout) if timeout is not None else None
+    queue = WorkQueue(path)
+    try:
+        queue.clear()
+        _, walked = enqueue_branches(
+            queue, service, start_date, end_date, app, deadline=deadline
+        )
+
+        processes = [
+            Process(
+                target=run_worker,
+                kwargs={"path": path, "deadline_at": deadline and deadline.expires_at},
+            )
+            for _ in range(workers or os.cpu_count() or 1)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        branches = merge_results(queue.items())
+
+        return {
+            "complete": walked
+            and all(branch["complete"] for branch in branches.values()),
+            "branches": branches,
+        }
+    finally:
+        queue.close()
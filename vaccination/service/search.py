@@ -0,0 +1,231 @@
+"""
+This module contains the location search index.
+
+Region, municipality and branch names are transliterated from Georgian to
+Latin and split into words, so "tbil", "თბილ" and "tbilsi" all find
+Tbilisi: words are matched by prefix first and fuzzily as a fallback.
+
+This file is part of the vaccination.py.
+
+(c) 2021 Temuri Takalandze <me@abgeo.dev>
+
+For the full copyright and license information, please view the LICENSE
+file that was distributed with this source code.
+"""
+
+import bisect
+import difflib
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
+
+from vaccination.service.api.booking import BookingAPIService
+
+TRANSLITERATION = str.maketrans(
+    {
+        "ა": "a",
+        "ბ": "b",
+        "გ": "g",
+        "დ": "d",
+        "ე": "e",
+        "ვ": "v",
+        "ზ": "z",
+        "თ": "t",
+        "ი": "i",
+        "კ": "k",
+        "ლ": "l",
+        "მ": "m",
+        "ნ": "n",
+        "ო": "o",
+        "პ": "p",
+        "ჟ": "zh",
+        "რ": "r",
+        "ს": "s",
+        "ტ": "t",
+        "უ": "u",
+        "ფ": "p",
+        "ქ": "k",
+        "ღ": "gh",
+        "ყ": "q",
+        "შ": "sh",
+        "ჩ": "ch",
+        "ც": "ts",
+        "ძ": "dz",
+        "წ": "ts",
+        "ჭ": "ch",
+        "ხ": "kh",
+        "ჯ": "j",
+        "ჰ": "h",
+    }
+)
+KINDS = ("branch", "municipality", "region")
+
+
+def normalize(text: str) -> str:
+    """
+    Transliterate text to lowercase Latin words separated by spaces.
+
+    :param str text: Text to normalize.
+    :return: Normalized text.
+    """
+
+    return " ".join(re.findall(r"\w+", text.lower().translate(TRANSLITERATION)))
+
+
+def _call(function: Callable, *args) -> any:
+    return function(*args)
+
+
+class LocationIndex:
+    """
+    Prefix and fuzzy search index over regions, municipalities and branches.
+
+    Every entry holds the (name, ID) pairs of its path in the hierarchy
+    under the "region", "municipality" and "branch" keys.
+    """
+
+    def __init__(self):
+        self.entries: List[Dict[str, any]] = []
+        self._words: List[Tuple[str, int]] = []
+        self._postings: Dict[str, List[int]] = {}
+
+    @classmethod
+    def build(
+        cls,
+        api_service: BookingAPIService,
+        service: str,
+        get: Callable = _call,
+        max_workers: int = 8,
+        regions: List[Dict[str, str]] = None,
+    ) -> "LocationIndex":
+        """
+        Build index from the CommonData endpoints.
+
+        :param BookingAPIService api_service: API service to use.
+        :param str service: Service ID.
+        :param get: Calls API methods, e.g. Prefetcher.get to reuse prefetched data.
+        :param int max_workers: Number of concurrent API calls.
+        :param regions: Regions the caller already has, fetched if not given.
+        :return: LocationIndex instance.
+        """
+
+        index = cls()
+        if regions is None:
+            regions = get(api_service.get_regions, service)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            municipalities = list(
+                executor.map(
+                    lambda region: get(
+                        api_service.get_municipalities, region["id"], service
+                    ),
+                    regions,
+                )
+            )
+            pairs = [
+                ((region["geoName"], region["id"]), (item["geoName"], item["id"]))
+                for region, items in zip(regions, municipalities)
+                for item in items
+            ]
+            branches = list(
+                executor.map(
+                    lambda pair: get(
+                        api_service.get_municipality_branches, service, pair[1][1]
+                    ),
+                    pairs,
+                )
+            )
+
+        for region in regions:
+            index.add({"region": (region["geoName"], region["id"])})
+        for (region, municipality), items in zip(pairs, branches):
+            index.add({"region": region, "municipality": municipality})
+            for branch in items:
+                index.add(
+                    {
+                        "region": region,
+                        "municipality": municipality,
+                        "branch": (branch["name"], branch["id"]),
+                    }
+                )
+        index.finalize()
+
+        return index
+
+    def add(self, entry: Dict[str, any]) -> None:
+        """
+        Add entry to the index, call finalize() after the last one.
+
+        :param entry: Entry with "region", "municipality" and/or "branch".
+        """
+
+        entry["kind"] = next(kind for kind in KINDS if kind in entry)
+        entry["label"] = " / ".join(
+            entry[kind][0] for kind in reversed(KINDS) if kind in entry
+        )
+        position = len(self.entries)
+        self.entries.append(entry)
+        for word in set(normalize(entry[entry["kind"]][0]).split()):
+            self._postings.setdefault(word, []).append(position)
+
+    def finalize(self) -> None:
+        """
+        Sort the word list for prefix lookups.
+        """
+
+        self._words = sorted(
+            (word, position)
+            for word, positions in self._postings.items()
+            for position in positions
+        )
+
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, any]]:
+        """
+        Find entries whose names match all words of the query.
+
+        :param str query: Search query in Georgian or Latin.
+        :param int limit: Maximum number of results.
+        :return: Entries, best matches and branches first.
+        """
+
+        scores = None
+        for token in normalize(query).split():
+            matches = {}
+            for index in range(
+                bisect.bisect_left(self._words, (token,)), len(self._words)
+            ):
+                word, position = self._words[index]
+                if not word.startswith(token):
+                    break
+                matches[position] = max(
+                    matches.get(position, 0), 2 if word == token else 1
+                )
+
+            if not matches:
+                for word in difflib.get_close_matches(
+                    token, self._postings.keys(), n=5, cutoff=0.75
+                ):
+                    for position in self._postings[word]:
+                        matches.setdefault(position, 0.5)
+
+            if scores is None:
+                scores = matches
+            else:
+                scores = {
+                    position: scores[position] + score
+                    for position, score in matches.items()
+                    if position in scores
+                }
+
+        if not scores:
+            return []
+
+        ranked = sorted(
+            scores,
+            key=lambda position: (
+                -scores[position],
+                KINDS.index(self.entries[position]["kind"]),
+                self.entries[position]["label"],
+            ),
+        )
+
+        return [self.entries[position] for position in ranked[:limit]]
@@ -0,0 +1,245 @@
+"""
+This module contains the compact binary snapshot format for crawl results.
+
+Layout (little-endian, sections aligned to 8 bytes):
+
+* header: magic "VSNP", version, string/location/slot counts and offsets;
+* weekday names: string indexes of the "week_day" names from Monday to
+  Sunday, as returned by the API;
+* string table: (offset, length) pairs into a UTF-8 blob, every distinct
+  ID and name is stored once;
+* locations: one fixed-width record per (branch, room) with string indexes
+  and the range of its slots;
+* slots: int64 UNIX timestamps, grouped by location and sorted by time.
+
+The reader memory-maps the file and decodes only what a query touches.
+
+This file is part of the vaccination.py.
+
+(c) 2021 Temuri Takalandze <me@abgeo.dev>
+
+For the full copyright and license information, please view the LICENSE
+file that was distributed with this source code.
+"""
+
+import bisect
+import mmap
+import struct
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Tuple
+
+from vaccination.service.pipeline import parse_slot_time
+
+MAGIC = b"VSNP"
+VERSION = 2
+HEADER = struct.Struct("<4sHHIIIQQQQ")
+WEEKDAYS = struct.Struct("<7I")
+STRING = struct.Struct("<II")
+LOCATION = struct.Struct("<7III")
+LOCATION_FIELDS = ("app", "service", "region", "municipality", "branch")
+NO_STRING = 0xFFFFFFFF
+EPOCH = datetime(1970, 1, 1)
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _collect(
+    records: Iterable[Dict[str, str]]
+) -> Tuple[Dict[str, int], Dict[Tuple[int, ...], List[int]], List[int]]:
+    strings = {}
+    locations = {}
+    week_days = [NO_STRING] * 7
+    for record in records:
+        key = tuple(
+            strings.setdefault(str(record[field]), len(strings))
+            for field in LOCATION_FIELDS + ("branch_name", "room")
+        )
+        slot_time = parse_slot_time(record)
+        locations.setdefault(key, []).append(int((slot_time - EPOCH).total_seconds()))
+        if record.get("week_day") is not None:
+            week_days[slot_time.weekday()] = strings.setdefault(
+                str(record["week_day"]), len(strings)
+            )
+
+    return strings, locations, week_days
+
+
+def _write_strings(file: BinaryIO, string_data: List[bytes]) -> None:
+    position = 0
+    for value in string_data:
+        file.write(STRING.pack(position, len(value)))
+        position += len(value)
+    for value in string_data:
+        file.write(value)
+
+
+def _write_locations(
+    file: BinaryIO, locations: Dict[Tuple[int, ...], List[int]]
+) -> None:
+    first = 0
+    for key, times in locations.items():
+        file.write(LOCATION.pack(*key, first, len(times)))
+        first += len(times)
+
+
+def write_snapshot(path: str, records: Iterable[Dict[str, str]]) -> int:
+    """
+    Write slot records, e.g. from pipeline.iter_slots(), into a snapshot.
+
+    :param str path: Snapshot file path.
+    :param records: Slot records.
+    :return: Number of written slots.
+    """
+
+    strings, locations, week_days = _collect(records)
+    string_data = [value.encode("utf-8") for value in strings]
+    strings_offset = _align(HEADER.size + WEEKDAYS.size)
+    blob_offset = strings_offset + STRING.size * len(string_data)
+    locations_offset = _align(blob_offset + sum(map(len, string_data)))
+    slots_offset = _align(locations_offset + LOCATION.size * len(locations))
+    slot_count = sum(map(len, locations.values()))
+
+    with open(path, "wb") as file:
+        file.write(
+            HEADER.pack(
+                MAGIC,
+                VERSION,
+                0,
+                len(string_data),
+                len(locations),
+                slot_count,
+                strings_offset,
+                blob_offset,
+                locations_offset,
+                slots_offset,
+            )
+        )
+        file.write(WEEKDAYS.pack(*week_days))
+
+        file.seek(strings_offset)
+        _write_strings(file, string_data)
+
+        file.seek(locations_offset)
+        _write_locations(file, locations)
+
+        file.seek(slots_offset)
+        for times in locations.values():
+            file.write(struct.pack(f"<{len(times)}q", *sorted(times)))
+
+    return slot_count
+
+
+class SnapshotReader:  # pylint: disable=too-many-instance-attributes
+    """
+    Memory-mapped snapshot reader.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (
+            magic,
+            version,
+            _,
+            self.string_count,
+            self.location_count,
+            self.slot_count,
+            self._strings_offset,
+            self._blob_offset,
+            self._locations_offset,
+            slots_offset,
+        ) = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"Unsupported snapshot file: {path}")
+
+        self._week_days = WEEKDAYS.unpack_from(self._mmap, HEADER.size)
+        self._slots = memoryview(self._mmap)[
+            slots_offset : slots_offset + 8 * self.slot_count
+        ].cast("q")
+        self.string = lru_cache(maxsize=4096)(self._string)
+
+    def __enter__(self) -> "SnapshotReader":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.slot_count
+
+    def close(self) -> None:
+        """
+        Release the memory map.
+        """
+
+        self._slots.release()
+        self._mmap.close()
+
+    def _string(self, index: int) -> str:
+        offset, length = STRING.unpack_from(
+            self._mmap, self._strings_offset + STRING.size * index
+        )
+        start = self._blob_offset + offset
+
+        return self._mmap[start : start + length].decode("utf-8")
+
+    def locations(self) -> Iterator[Dict[str, any]]:
+        """
+        Iterate over the (branch, room) locations.
+
+        :return: Location records with "first_slot" and "slot_count".
+        """
+
+        for index in range(self.location_count):
+            *strings, first, count = LOCATION.unpack_from(
+                self._mmap, self._locations_offset + LOCATION.size * index
+            )
+            location = {
+                field: self.string(string)
+                for field, string in zip(
+                    LOCATION_FIELDS + ("branch_name", "room"), strings
+                )
+            }
+            location["first_slot"] = first
+            location["slot_count"] = count
+            yield location
+
+    def slots(
+        self, branch: str = None, start: datetime = None, end: datetime = None
+    ) -> Iterator[Dict[str, str]]:
+        """
+        Query slots, optionally of a single branch and within [start, end).
+
+        :param str branch: Branch ID.
+        :param datetime start: Earliest slot time.
+        :param datetime end: Slot time upper bound (exclusive).
+        :return: Slot records compatible with pipeline.iter_slots().
+        """
+
+        low = int((start - EPOCH).total_seconds()) if start else None
+        high = int((end - EPOCH).total_seconds()) if end else None
+        for location in self.locations():
+            if branch is not None and location["branch"] != branch:
+                continue
+
+            first = location.pop("first_slot")
+            last = first + location.pop("slot_count")
+            if low is not None:
+                first = bisect.bisect_left(self._slots, low, first, last)
+            if high is not None:
+                last = bisect.bisect_left(self._slots, high, first, last)
+
+            for index in range(first, last):
+                slot_time = EPOCH + timedelta(seconds=self._slots[index])
+                week_day = self._week_days[slot_time.weekday()]
+                yield dict(
+                    location,
+                    date=slot_time.date().isoformat(),
+                    week_day=self.string(week_day) if week_day != NO_STRING else None,
+                    time=slot_time.strftime("%H:%M"),
+                )